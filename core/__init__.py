@@ -3,12 +3,45 @@ Universal Product Specs Extractor - Robust Version
 可累加的配置驱动产品规格提取器 - 健壮版
 """
 
-from .rule_engine import RuleEngine, ProductProfile, ExtractionRule, get_rule_engine
-from .visual_analyzer import VisualStructureAnalyzer
-from .page_analyzer import PageAnalyzer, PageAnalysisReport
-from .universal_extractor import UniversalExtractor, extract_specs
-from .robust_extractor import RobustUniversalExtractor, extract_robust, analyze_page
-from .config_wizard import ConfigurationWizard
+import importlib
+import sys
+from pathlib import Path
+
+# scripts/ 下的模块（html_utils、direct_extractor）按顶层模块导入，与直接使用脚本时是同一份模块
+_SCRIPTS_DIR = str(Path(__file__).parent.parent / 'scripts')
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
+
+# 公开名称 -> 所在子模块；首次访问时才导入，导入单个子模块（如 core.robust_extractor）不会连带加载其余组件
+_LAZY_EXPORTS = {
+    'RuleEngine': '.rule_engine',
+    'ProductProfile': '.rule_engine',
+    'ExtractionRule': '.rule_engine',
+    'get_rule_engine': '.rule_engine',
+    'VisualStructureAnalyzer': '.visual_analyzer',
+    'PageAnalyzer': '.page_analyzer',
+    'PageAnalysisReport': '.page_analyzer',
+    'UniversalExtractor': '.universal_extractor',
+    'extract_specs': '.universal_extractor',
+    'RobustUniversalExtractor': '.robust_extractor',
+    'extract_robust': '.robust_extractor',
+    'analyze_page': '.robust_extractor',
+    'ConfigurationWizard': '.config_wizard',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __version__ = "2.1.0"
 __all__ = [
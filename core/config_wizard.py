@@ -6,6 +6,10 @@
 import json
 from typing import Dict, List, Optional
 from pathlib import Path
+import yaml
+
+# 优先使用libyaml的C实现
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
 
 class ConfigurationWizard:
@@ -192,47 +196,53 @@ class ConfigurationWizard:
     
     def _generate_profile_yaml(self, name: str, parent: str, rules: Dict) -> str:
         """生成配置文件YAML"""
-        lines = [
-            f"# Auto-generated profile: {name}",
-            f"name: \"{name}\"",
-            "brand: \"H3C\"",
-            "product_type: \"switch\"",
-            "sub_type: \"box\"",
-            "version: \"1.0\"",
-            f"parent_profile: \"{parent}\"",
-            "",
-            "# Inherited rules from parent will be merged automatically",
-            "",
-            "# Additional table detection rules:",
-        ]
+        profile = {
+            'name': name,
+            'brand': 'H3C',
+            'product_type': 'switch',
+            'sub_type': 'box',
+            'version': '1.0',
+            'parent_profile': parent,
+        }
         
-        if rules.get("table_rules"):
-            lines.append("table_detection_rules:")
-            for rule in rules["table_rules"]:
-                lines.append(f"  - name: \"{rule['name']}\"")
-                lines.append(f"    pattern: \"{rule['pattern']}\"")
-                lines.append(f"    rule_type: \"table_detection\"")
-                lines.append(f"    action: \"use_extractor\"")
-                lines.append(f"    params:")
-                lines.append(f"      extractor: \"{rule['type']}\"")
-                lines.append(f"    priority: 90")
-                lines.append("")
+        # 新增的表格检测规则
+        table_rules = [
+            {
+                'name': rule['name'],
+                'pattern': rule['pattern'],
+                'rule_type': 'table_detection',
+                'action': 'use_extractor',
+                'params': {'extractor': rule['type']},
+                'priority': 90,
+            }
+            for rule in rules.get('table_rules', [])
+        ]
+        if table_rules:
+            profile['table_detection_rules'] = table_rules
         
-        if rules.get("param_mappings"):
-            lines.append("# Additional parameter mapping rules:")
-            lines.append("param_mapping_rules:")
-            for rule in rules["param_mappings"]:
-                if rule["target"]:
-                    lines.append(f"  - name: \"{rule['name']}\"")
-                    lines.append(f"    pattern: \"{rule['pattern']}\"")
-                    lines.append(f"    rule_type: \"param_mapping\"")
-                    lines.append(f"    action: \"map_to\"")
-                    lines.append(f"    params:")
-                    lines.append(f"      target: \"{rule['target']}\"")
-                    lines.append(f"    priority: 100")
-                    lines.append("")
+        # 新增的参数映射规则（未指定目标名的保持原样，不生成规则）
+        param_rules = [
+            {
+                'name': rule['name'],
+                'pattern': rule['pattern'],
+                'rule_type': 'param_mapping',
+                'action': 'map_to',
+                'params': {'target': rule['target']},
+                'priority': 100,
+            }
+            for rule in rules.get('param_mappings', [])
+            if rule['target']
+        ]
+        if param_rules:
+            profile['param_mapping_rules'] = param_rules
         
-        return '\n'.join(lines)
+        header = (
+            f"# Auto-generated profile: {name}\n"
+            "# Inherited rules from parent will be merged automatically\n"
+            "\n"
+        )
+        return header + yaml.dump(profile, Dumper=_YAML_DUMPER, sort_keys=False,
+                                  allow_unicode=True)
     
     def _save_config(self, name: str, config: str):
         """保存配置文件"""
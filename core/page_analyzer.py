@@ -3,12 +3,19 @@
 """
 
 import re
+import copy
+import hashlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
-from bs4 import BeautifulSoup
+from lxml import etree
 
+# 解析和文本提取与 scripts/direct_extractor 共用 scripts/html_utils，两边看到的页面文本一致
+from html_utils import TABLE_OPEN_RE, element_text, element_text_prefix, parse_document, row_cells
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class TableAnalysis:
     """表格分析结果"""
     index: int
@@ -20,9 +27,10 @@ class TableAnalysis:
     sample_data: List[Dict]
     suggested_extractor: str
     confidence: float
+    headers_lower: List[str] = field(default_factory=list, repr=False, compare=False)  # 小写表头，供类型检测和配置推荐复用
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ParameterDiscovery:
     """参数发现结果"""
     original_name: str
@@ -33,7 +41,7 @@ class ParameterDiscovery:
     value_type: str  # 'number', 'string', 'enum'
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PageAnalysisReport:
     """页面分析报告"""
     url: str
@@ -45,6 +53,42 @@ class PageAnalysisReport:
     confidence: float
 
 
+# 表头单元格同样只取各行的直接子元素
+_thead_cells = etree.XPath('tr/th|tr/td')
+# 合并单元格检查整体交给 libxml2 求值，不在 Python 中逐个遍历后代节点
+_has_rowspan = etree.XPath('boolean(.//*[@rowspan])')
+_has_colspan = etree.XPath('boolean(.//*[@colspan])')
+
+
+def _index_patterns(patterns: Dict[str, Dict], field_name: str) -> tuple:
+    """建立 (关键词, 表格类型序号) 倒排索引，共享的关键词只需匹配一次"""
+    index: Dict[str, list] = {}
+    for type_id, pattern in enumerate(patterns.values()):
+        for kw in pattern[field_name]:
+            index.setdefault(kw, []).append(type_id)
+    return tuple((kw, tuple(type_ids)) for kw, type_ids in index.items())
+
+
+def _flatten_categories(categories: Dict[str, List[str]]) -> tuple:
+    """按分类顺序展开为 (关键词, 分类) 序列，重复关键词只保留最先出现的分类"""
+    keyword_to_category: Dict[str, str] = {}
+    for category, keywords in categories.items():
+        for kw in keywords:
+            keyword_to_category.setdefault(kw, category)
+    return tuple(keyword_to_category.items())
+
+
+def _remaining_weights(index: tuple, weight: int, type_count: int) -> tuple:
+    """计算倒排索引中每个位置之后各表格类型还能获得的得分上限"""
+    remaining = [0] * type_count
+    suffix = []
+    for _, type_ids in reversed(index):
+        suffix.append(tuple(remaining))
+        for type_id in type_ids:
+            remaining[type_id] += weight
+    return tuple(reversed(suffix))
+
+
 class PageAnalyzer:
     """页面结构分析器"""
     
@@ -81,6 +125,11 @@ class PageAnalyzer:
             'extractor': 'single_model_hardware'
         }
     }
+    _TABLE_TYPES = tuple(TABLE_PATTERNS)
+    _KEYWORD_INDEX = _index_patterns(TABLE_PATTERNS, 'keywords')
+    _HEADER_INDEX = _index_patterns(TABLE_PATTERNS, 'headers')
+    _KEYWORD_REMAINING = _remaining_weights(_KEYWORD_INDEX, 2, len(TABLE_PATTERNS))
+    _CONFIDENT_SCORE = 10  # 达到该得分后置信度已封顶为 1.0
     
     # 已知参数分类
     PARAM_CATEGORIES = {
@@ -91,79 +140,130 @@ class PageAnalyzer:
         'management': ['console', 'usb', 'management', 'port'],
         'hardware': ['cpu', 'memory', 'flash', 'sdram']
     }
+    _CATEGORY_KEYWORDS = _flatten_categories(PARAM_CATEGORIES)
+    
+    # 常见参数的中文映射
+    PARAM_MAPPINGS = {
+        'port switching capacity': '交换容量',
+        'forwarding rate': '包转发率',
+        'mac address entries': 'MAC地址表',
+        'vlan table': 'VLAN表项',
+        'dimensions': '尺寸',
+        'weight': '重量',
+        'power supply slots': '电源槽位数',
+        'fan number': '风扇数量',
+    }
+    
+    # 值类型判断
+    _RE_INT = re.compile(r'^\d+$')
+    _RE_NUM_UNIT = re.compile(r'^\d+\s*[KMG]?(?:bps|Hz)?$', re.I)
+    
+    # 表格分析缓存: 页面内容摘要 -> (表格分析, 发现的参数, 规则建议)，按LRU淘汰；
+    # 这些结果与URL无关，推荐配置和置信度每次调用时按URL计算
+    REPORT_CACHE_SIZE = 32
+    _report_cache: 'OrderedDict[bytes, tuple]' = OrderedDict()
     
     def __init__(self):
         self.discovered_params: Dict[str, ParameterDiscovery] = {}
     
+    @classmethod
+    def cache_clear(cls):
+        """清空分析报告缓存"""
+        cls._report_cache.clear()
+    
     def analyze(self, html: str, url: str) -> PageAnalysisReport:
-        """分析页面结构"""
-        soup = BeautifulSoup(html, 'lxml')
-        tables = soup.find_all('table')
-        
-        # 分析表格
-        table_analyses = []
-        for i, table in enumerate(tables):
-            analysis = self._analyze_table(table, i)
-            if analysis:
-                table_analyses.append(analysis)
+        """分析页面结构（同一页面重复分析时复用缓存的表格分析）"""
+        key = hashlib.blake2b((html or '').encode('utf-8'), digest_size=16).digest()
+        cache = self._report_cache
+        cached = cache.get(key)
+        if cached is None:
+            cached = self._analyze_tables(html)
+            cache[key] = cached
+            if len(cache) > self.REPORT_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
         
-        # 发现参数
-        self._discover_parameters(soup, table_analyses)
+        # 调用方可能修改报告中的列表和字典，每次返回独立副本，缓存内容不受影响
+        table_analyses, discovered_params, suggested_rules = copy.deepcopy(cached)
+        self.discovered_params = {p.original_name.lower().strip(): p for p in discovered_params}
         
         # 推荐配置
         suggested_profile = self._suggest_profile(url, table_analyses)
         
-        # 生成规则建议
-        suggested_rules = self._generate_rule_suggestions(table_analyses)
-        
         # 计算置信度
         confidence = self._calculate_confidence(table_analyses, suggested_profile)
         
         return PageAnalysisReport(
             url=url,
             detected_tables=table_analyses,
-            discovered_params=list(self.discovered_params.values()),
+            discovered_params=discovered_params,
             suggested_profile=suggested_profile,
             suggested_rules=suggested_rules,
             missing_patterns=[],
             confidence=confidence
         )
     
+    def _analyze_tables(self, html: str) -> tuple:
+        """解析页面并分析表格、发现参数、生成规则建议（与URL无关的部分）"""
+        self.discovered_params = {}
+        doc = self._parse_html(html)
+        tables = list(doc.iter('table')) if doc is not None else []
+        
+        # 分析表格（逐个串行：文本提取走 itertext 的 Python 迭代，lxml 的 XPath 求值也不释放 GIL，
+        # 线程池并不能并行，反而增加调度开销）
+        table_analyses = [
+            analysis for analysis in map(self._analyze_table, tables, range(len(tables)))
+            if analysis
+        ]
+        
+        # 发现参数
+        self._discover_parameters(doc, table_analyses)
+        
+        # 生成规则建议
+        suggested_rules = self._generate_rule_suggestions(table_analyses)
+        
+        return table_analyses, list(self.discovered_params.values()), suggested_rules
+    
+    def _parse_html(self, html: str):
+        """用lxml解析整页，表格遍历全部在libxml2中完成（页面中没有<table>标签时不必解析）"""
+        if not html or not TABLE_OPEN_RE.search(html):
+            return None
+        return parse_document(html)
+    
     def _analyze_table(self, table, index: int) -> Optional[TableAnalysis]:
         """分析单个表格"""
-        text = table.get_text(strip=True)
+        # 先看结构：没有任何行的表格不是数据表，不必再提取文本
+        rows = list(table.iter('tr'))
+        if not rows:
+            return None
+        
+        text = element_text(table)
         if len(text) < 200:  # 跳过小表格
             return None
         
         # 解析表头
-        headers = []
-        header_row = table.find('thead')
-        if header_row:
-            headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
-        else:
-            first_row = table.find('tr')
-            if first_row:
-                headers = [cell.get_text(strip=True) for cell in first_row.find_all(['th', 'td'])]
+        thead = table.find('.//thead')
+        header_cells = row_cells(rows[0]) if thead is None else _thead_cells(thead)
+        headers = [element_text(cell) for cell in header_cells]
+        headers_lower = [h.lower() for h in headers]
         
         # 检测表格类型
-        table_type, extractor, confidence = self._detect_table_type(text, headers)
+        table_type, extractor, confidence = self._detect_table_type(text, headers_lower)
         
         # 检测合并单元格
-        has_rowspan = bool(table.find(attrs={'rowspan': True}))
-        has_colspan = bool(table.find(attrs={'colspan': True}))
+        has_rowspan = _has_rowspan(table)
+        has_colspan = _has_colspan(table)
         
         # 统计行数
-        rows = table.find_all('tr')
         row_count = len(rows) - 1  # 减去表头
         
         # 采样数据
         sample_data = []
         for row in rows[1:4]:  # 取前3行数据
-            cells = row.find_all(['td', 'th'])
-            row_data = {}
-            for i, cell in enumerate(cells):
-                if i < len(headers):
-                    row_data[headers[i]] = cell.get_text(strip=True)[:100]
+            texts = [element_text_prefix(cell, 100) for cell in row_cells(row)]
+            # zip 在较短一侧结束，多出表头的单元格自然被丢弃
+            row_data = dict(zip(headers, texts))
             if row_data:
                 sample_data.append(row_data)
         
@@ -176,73 +276,94 @@ class PageAnalyzer:
             has_colspan=has_colspan,
             sample_data=sample_data,
             suggested_extractor=extractor,
-            confidence=confidence
+            confidence=confidence,
+            headers_lower=headers_lower
         )
     
-    def _detect_table_type(self, text: str, headers: List[str]) -> tuple:
-        """检测表格类型"""
+    def _detect_table_type(self, text: str, headers_lower: List[str]) -> tuple:
+        """检测表格类型（表头需已转为小写）"""
         text_lower = text.lower()
-        header_str = ' '.join(h.lower() for h in headers)
+        header_str = ' '.join(headers_lower)
         
-        scores = {}
-        for table_type, pattern in self.TABLE_PATTERNS.items():
-            score = 0
-            # 关键词匹配
-            for kw in pattern['keywords']:
-                if kw in text_lower:
-                    score += 2
-            # 表头匹配
-            for h in pattern['headers']:
-                if h in header_str:
-                    score += 3
-            scores[table_type] = score
+        # 每个关键词只查找一次，按类型序号累加到得分向量；
+        # 表头串很短，先累加表头得分，便于正文关键词阶段尽早确定胜者
+        scores = [0] * len(self._TABLE_TYPES)
+        for h, type_ids in self._HEADER_INDEX:
+            if h in header_str:
+                for type_id in type_ids:
+                    scores[type_id] += 3
+        for i, (kw, type_ids) in enumerate(self._KEYWORD_INDEX):
+            if kw in text_lower:
+                for type_id in type_ids:
+                    scores[type_id] += 2
+                if self._is_decided(scores, self._KEYWORD_REMAINING[i]):
+                    break
         
         if scores:
-            best_type = max(scores, key=scores.get)
-            best_score = scores[best_type]
+            best_id = max(range(len(scores)), key=scores.__getitem__)
+            best_type = self._TABLE_TYPES[best_id]
+            best_score = scores[best_id]
             confidence = min(best_score / 10, 1.0)  # 归一化
             extractor = self.TABLE_PATTERNS[best_type]['extractor']
             return best_type, extractor, confidence
         
         return 'unknown', 'generic', 0.3
     
-    def _discover_parameters(self, soup: BeautifulSoup, tables: List[TableAnalysis]):
+    @classmethod
+    def _is_decided(cls, scores: list, remaining: tuple) -> bool:
+        """领先类型置信度已封顶，且其余类型即使命中剩余全部关键词也无法反超"""
+        best_id = max(range(len(scores)), key=scores.__getitem__)
+        best_score = scores[best_id]
+        if best_score < cls._CONFIDENT_SCORE:
+            return False
+        for type_id, score in enumerate(scores):
+            if type_id == best_id:
+                continue
+            reachable = score + remaining[type_id]
+            # 平分时 max 取序号靠前者，因此靠前的类型追平即可反超
+            if reachable > best_score or (reachable == best_score and type_id < best_id):
+                return False
+        return True
+    
+    def _discover_parameters(self, doc, tables: List[TableAnalysis]):
         """发现页面中的参数"""
+        # 先统计出现次数，记录每个参数首次出现时的原始名称和样本行
+        frequency: Counter = Counter()
+        first_seen: Dict[str, tuple] = {}
         for table_analysis in tables:
-            if table_analysis.table_type == 'hardware_multi':
-                # 从硬件表中提取参数名
-                for sample in table_analysis.sample_data:
-                    feature = sample.get(table_analysis.headers[0], '')
-                    if feature:
-                        self._add_discovered_param(feature, sample)
-    
-    def _add_discovered_param(self, name: str, sample_row: Dict):
-        """添加发现的参数"""
-        name_normalized = name.lower().strip()
+            if table_analysis.table_type != 'hardware_multi' or not table_analysis.sample_data:
+                continue
+            # 从硬件表中提取参数名（参数名列固定为第一列，按表只取一次）
+            feature_header = table_analysis.headers[0]
+            for sample in table_analysis.sample_data:
+                feature = sample.get(feature_header)
+                if not feature:
+                    continue
+                # 单元格文本已去除首尾空白，但截断到100字符后末尾可能是空格
+                name_normalized = feature.lower().strip()
+                frequency[name_normalized] += 1
+                if name_normalized not in first_seen:
+                    first_seen[name_normalized] = (feature, sample)
         
-        if name_normalized in self.discovered_params:
-            self.discovered_params[name_normalized].frequency += 1
-        else:
-            # 推测分类和类型
-            category = self._guess_category(name_normalized)
-            value_type = self._guess_value_type(name_normalized, sample_row)
-            suggested_mapping = self._suggest_mapping(name_normalized)
-            
+        # 每个参数只推测一次分类和类型
+        for name_normalized, count in frequency.items():
+            name, sample_row = first_seen[name_normalized]
             self.discovered_params[name_normalized] = ParameterDiscovery(
                 original_name=name,
-                frequency=1,
+                frequency=count,
                 sample_values=[],
-                suggested_mapping=suggested_mapping,
-                suggested_category=category,
-                value_type=value_type
+                suggested_mapping=self._suggest_mapping(name_normalized),
+                suggested_category=self._guess_category(name_normalized),
+                value_type=self._guess_value_type(name_normalized, sample_row)
             )
     
-    def _guess_category(self, param_name: str) -> str:
-        """推测参数分类"""
-        for category, keywords in self.PARAM_CATEGORIES.items():
-            for kw in keywords:
-                if kw in param_name:
-                    return category
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _guess_category(param_name: str) -> str:
+        """推测参数分类（同名参数在各表、各页面反复出现，结果缓存）"""
+        for kw, category in PageAnalyzer._CATEGORY_KEYWORDS:
+            if kw in param_name:
+                return category
         return 'other'
     
     def _guess_value_type(self, param_name: str, sample: Dict) -> str:
@@ -250,29 +371,28 @@ class PageAnalyzer:
         # 根据值的内容判断
         for key, value in sample.items():
             if key != param_name and value:
-                if re.match(r'^\d+$', value):
-                    return 'number'
-                elif re.match(r'^\d+\s*[KMG]?(bps|Hz)?$', value, re.I):
-                    return 'number_with_unit'
-                elif ';' in value or ',' in value:
-                    return 'list'
+                value_type = self._classify_value(value)
+                if value_type:
+                    return value_type
         return 'string'
     
-    def _suggest_mapping(self, param_name: str) -> Optional[str]:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _classify_value(value: str) -> Optional[str]:
+        """判断单个取值的类型，无法判断时返回None"""
+        if PageAnalyzer._RE_INT.match(value):
+            return 'number'
+        elif PageAnalyzer._RE_NUM_UNIT.match(value):
+            return 'number_with_unit'
+        elif ';' in value or ',' in value:
+            return 'list'
+        return None
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _suggest_mapping(param_name: str) -> Optional[str]:
         """建议中文映射"""
-        # 常见映射
-        mappings = {
-            'port switching capacity': '交换容量',
-            'forwarding rate': '包转发率',
-            'mac address entries': 'MAC地址表',
-            'vlan table': 'VLAN表项',
-            'dimensions': '尺寸',
-            'weight': '重量',
-            'power supply slots': '电源槽位数',
-            'fan number': '风扇数量',
-        }
-        
-        for en, cn in mappings.items():
+        for en, cn in PageAnalyzer.PARAM_MAPPINGS.items():
             if en in param_name:
                 return cn
         return None
@@ -290,7 +410,7 @@ class PageAnalyzer:
         # 根据表格结构判断
         has_chassis_params = any(
             t.table_type == 'hardware_multi' and 
-            any('slot' in h.lower() for h in t.headers)
+            any('slot' in h for h in t.headers_lower)
             for t in tables
         )
         if has_chassis_params:
@@ -3,18 +3,46 @@ Robust Universal Extractor - 增强版通用提取器
 集成视觉结构分析、配置驱动、累加规则
 """
 
+import io
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 
-# 导入核心组件
+# 导入核心组件（视觉分析器、配置向导和原始提取器在首次使用时再导入）
 from .rule_engine import get_rule_engine, ProductProfile
-from .visual_analyzer import VisualStructureAnalyzer
-from .config_wizard import ConfigurationWizard
 
-# 保持向后兼容 - 导入原始提取器
-sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
-from direct_extractor import extract_tables_direct
+# 配置检测用的预编译模式（在已转小写的字符串上匹配）
+_CHASSIS_URL_RE = re.compile(r's125|s105|s76|s75|s95|s98|chassis')   # 框式交换机
+_BOX_URL_RE = re.compile(r's5130|s5590|s6520|s5560|s5500')           # 盒式交换机
+_CHASSIS_HEADER_RE = re.compile(r'slot|chassis|module|板|槽')         # 槽位相关表头
+_WORD_RE = re.compile(r'\w+')                                         # 表头中的单词字符片段
+
+
+def _extract_tables_direct(html: str, url: str) -> Dict[str, Dict]:
+    """保持向后兼容 - 调用原始提取器（首次调用时才导入）"""
+    from direct_extractor import extract_tables_direct
+    return extract_tables_direct(html, url)
+
+
+@lru_cache(maxsize=512)
+def _pattern_from_headers(headers: Tuple[str, ...]) -> str:
+    """由前两个表头生成匹配模式，相同表头组合的结果缓存"""
+    if not headers:
+        return ".*"
+    
+    # 取前两个有意义的表头词
+    keywords = []
+    for h in headers:
+        # 拼接单词字符片段，等价于删除所有非单词字符
+        h_clean = ''.join(_WORD_RE.findall(h.lower()))
+        if len(h_clean) > 3:
+            keywords.append(h_clean[:15])
+    
+    if keywords:
+        return '.*'.join(keywords)
+    return ".*"
 
 
 class RobustUniversalExtractor:
@@ -31,13 +59,29 @@ class RobustUniversalExtractor:
     def __init__(self, config_dir: str = "config"):
         self.config_dir = config_dir
         self.engine = get_rule_engine(config_dir)
-        self.visual_analyzer = VisualStructureAnalyzer()
-        self.wizard = ConfigurationWizard(config_dir)
+        self._visual_analyzer = None
+        self._wizard = None
         
         # 分析结果
         self.visual_report: Optional[Dict] = None
         self.extracted_data: Dict[str, Dict] = {}
         self.profile: Optional[ProductProfile] = None
+    
+    @property
+    def visual_analyzer(self):
+        """视觉结构分析器（首次访问时创建）"""
+        if self._visual_analyzer is None:
+            from .visual_analyzer import VisualStructureAnalyzer
+            self._visual_analyzer = VisualStructureAnalyzer()
+        return self._visual_analyzer
+    
+    @property
+    def wizard(self):
+        """配置向导（首次访问时创建）"""
+        if self._wizard is None:
+            from .config_wizard import ConfigurationWizard
+            self._wizard = ConfigurationWizard(self.config_dir)
+        return self._wizard
         
     def extract_with_analysis(self, html: str, url: str = "", 
                               profile_name: str = None,
@@ -90,7 +134,7 @@ class RobustUniversalExtractor:
         print("📊 正在提取数据...")
         try:
             # 优先使用原始提取器（已验证稳定）
-            self.extracted_data = extract_tables_direct(html, url)
+            self.extracted_data = _extract_tables_direct(html, url)
         except Exception as e:
             print(f"⚠️  提取出错: {e}")
             self.extracted_data = {}
@@ -192,55 +236,56 @@ class RobustUniversalExtractor:
         
         return '\n'.join(lines)
     
-    def _detect_profile_from_url(self, url: str) -> Optional[str]:
-        """从URL检测适用的配置"""
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _detect_profile_from_url(url: str) -> Optional[str]:
+        """从URL检测适用的配置（批量抓取时同一URL反复检测，结果缓存）"""
         url_lower = url.lower()
         
         # 框式交换机
-        if any(x in url_lower for x in ['s125', 's105', 's76', 's75', 's95', 's98', 'chassis']):
+        if _CHASSIS_URL_RE.search(url_lower):
             return 'H3C-Switch-Chassis'
         
         # 盒式交换机
-        if any(x in url_lower for x in ['s5130', 's5590', 's6520', 's5560', 's5500']):
+        if _BOX_URL_RE.search(url_lower):
             return 'H3C-Switch-Box'
         
         return None
     
     def _detect_profile_from_structure(self, report: Dict) -> Optional[str]:
         """从结构分析检测适用的配置"""
-        # 检查是否有框式特征
-        for table in report.get('table_analysis', []):
-            headers = table.get('headers', [])
-            header_str = ' '.join(headers).lower()
-            
-            # 框式特征：槽位相关参数
-            if any(x in header_str for x in ['slot', 'chassis', 'module', '板', '槽']):
-                return 'H3C-Switch-Chassis'
+        # 检查是否有框式特征：所有表格的表头拼接后统一转小写、只扫描一次。
+        # 关键词不含空白，用换行分隔各表即可保证不会跨表匹配
+        header_text = '\n'.join(
+            ' '.join(table.get('headers', []))
+            for table in report.get('table_analysis', [])
+        ).lower()
+        
+        # 框式特征：槽位相关参数
+        if _CHASSIS_HEADER_RE.search(header_text):
+            return 'H3C-Switch-Chassis'
         
         # 检查区域类型
-        for region in report.get('content_regions', []):
-            if 'chassis' in region.get('type', '').lower():
-                return 'H3C-Switch-Chassis'
+        if any('chassis' in region.get('type', '').lower()
+               for region in report.get('content_regions', [])):
+            return 'H3C-Switch-Chassis'
         
         return None
     
     def _validate_and_enrich(self):
         """验证并丰富提取结果"""
-        if not self.extracted_data:
+        if not self.extracted_data or not self.visual_report:
             return
         
-        # 对比视觉分析结果
-        if self.visual_report:
-            # 检查是否遗漏了某些表格
-            extracted_models = set(self.extracted_data.keys())
-            detected_models = set()
-            
-            for region in self.visual_report.get('content_regions', []):
-                detected_models.update(region.get('model_names', []))
-            
-            missing_models = detected_models - extracted_models
-            if missing_models:
-                print(f"⚠️  视觉分析发现但未提取的型号: {missing_models}")
+        # 对比视觉分析结果，检查是否遗漏了某些表格
+        missing_models = {
+            model
+            for region in self.visual_report.get('content_regions', ())
+            for model in region.get('model_names') or ()
+            if model not in self.extracted_data
+        }
+        if missing_models:
+            print(f"⚠️  视觉分析发现但未提取的型号: {missing_models}")
     
     def _generate_improvement_suggestions(self) -> List[Dict]:
         """生成改进建议"""
@@ -266,72 +311,63 @@ class RobustUniversalExtractor:
         return suggestions
     
     def _generate_pattern_from_headers(self, headers: List[str]) -> str:
-        """从表头生成匹配模式"""
-        if not headers:
-            return ".*"
-        
-        # 取前两个有意义的表头词
-        keywords = []
-        for h in headers[:2]:
-            h_clean = re.sub(r'[^\w]', '', h.lower())
-            if len(h_clean) > 3:
-                keywords.append(h_clean[:15])
-        
-        if keywords:
-            return '.*'.join(keywords)
-        return ".*"
+        """从表头生成匹配模式（只用到前两个表头）"""
+        return _pattern_from_headers(tuple(headers[:2]))
     
     def get_detailed_report(self) -> str:
         """获取详细的文本报告"""
         if not self.visual_report:
             return "No analysis performed yet."
         
-        lines = [
-            "=" * 70,
-            "视觉结构分析报告",
-            "=" * 70,
-            "",
-            f"📊 页面概览:",
-            f"   视觉区块数: {self.visual_report['summary']['total_blocks']}",
-            f"   内容区域数: {self.visual_report['summary']['content_regions']}",
-            f"   表格数量: {self.visual_report['summary']['tables_found']}",
-            f"   发现的模式: {self.visual_report['summary']['patterns_discovered']}",
-            "",
-            f"📑 内容区域:",
-        ]
+        report = self.visual_report
+        summary = report['summary']
+        rule = "=" * 70
+        
+        # 每条记录拼成一个多行块一次写入，最后一行分隔线后不带换行
+        buf = io.StringIO()
+        buf.write(
+            f"{rule}\n视觉结构分析报告\n{rule}\n\n"
+            f"📊 页面概览:\n"
+            f"   视觉区块数: {summary['total_blocks']}\n"
+            f"   内容区域数: {summary['content_regions']}\n"
+            f"   表格数量: {summary['tables_found']}\n"
+            f"   发现的模式: {summary['patterns_discovered']}\n\n"
+            f"📑 内容区域:\n"
+        )
+        
+        for region in report['content_regions']:
+            models = (f"      型号: {', '.join(region['model_names'][:5])}\n"
+                      if region.get('model_names') else "")
+            buf.write(
+                f"   [{region['type']}] {region['title']}\n"
+                f"      区块: {region['block_count']}, 表格: {region['table_count']}\n"
+                f"{models}\n"
+            )
+        
+        buf.write("📋 表格分析:\n")
         
-        for region in self.visual_report['content_regions']:
-            lines.append(f"   [{region['type']}] {region['title']}")
-            lines.append(f"      区块: {region['block_count']}, 表格: {region['table_count']}")
-            if region.get('model_names'):
-                lines.append(f"      型号: {', '.join(region['model_names'][:5])}")
-            lines.append("")
-        
-        lines.extend([
-            f"📋 表格分析:",
-        ])
-        
-        for table in self.visual_report['table_analysis']:
-            lines.append(f"   表格 {table['index']}: {table['type']}")
-            lines.append(f"      置信度: {table['confidence']:.2f}")
-            lines.append(f"      尺寸: {table['dimensions']}")
-            lines.append(f"      建议提取器: {table['suggested_extractor']}")
-            if table.get('suggested_mappings'):
-                lines.append(f"      参数映射建议: {len(table['suggested_mappings'])}个")
-            lines.append("")
-        
-        if self.visual_report.get('recommendations'):
-            lines.extend([
-                f"💡 改进建议:",
-            ])
-            for rec in self.visual_report['recommendations']:
-                lines.append(f"   [{rec['priority']}] {rec['message']}")
-                lines.append(f"      操作: {rec.get('action', 'N/A')}")
-                lines.append("")
-        
-        lines.append("=" * 70)
-        
-        return '\n'.join(lines)
+        for table in report['table_analysis']:
+            mappings = (f"      参数映射建议: {len(table['suggested_mappings'])}个\n"
+                        if table.get('suggested_mappings') else "")
+            buf.write(
+                f"   表格 {table['index']}: {table['type']}\n"
+                f"      置信度: {table['confidence']:.2f}\n"
+                f"      尺寸: {table['dimensions']}\n"
+                f"      建议提取器: {table['suggested_extractor']}\n"
+                f"{mappings}\n"
+            )
+        
+        if report.get('recommendations'):
+            buf.write("💡 改进建议:\n")
+            for rec in report['recommendations']:
+                buf.write(
+                    f"   [{rec['priority']}] {rec['message']}\n"
+                    f"      操作: {rec.get('action', 'N/A')}\n\n"
+                )
+        
+        buf.write(rule)
+        
+        return buf.getvalue()
 
 
 # 便捷函数
@@ -344,5 +380,6 @@ def extract_robust(html: str, url: str = "", profile: str = None,
 
 def analyze_page(html: str, url: str = "") -> Dict:
     """便捷分析函数"""
+    from .visual_analyzer import VisualStructureAnalyzer
     analyzer = VisualStructureAnalyzer()
     return analyzer.analyze(html, url)
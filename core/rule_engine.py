@@ -3,15 +3,47 @@ Universal Product Specs Extractor - Rule Engine
 可累加的配置驱动规则引擎
 """
 
+import copy
 import yaml
 import json
+import os
 import re
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 
+# 优先使用libyaml的C实现
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
 
-@dataclass
+
+# 已解析的YAML内容，按 (路径, mtime_ns, 文件大小) 缓存，文件未改动时跳过重复解析
+# 缓存的数据在多个引擎实例间共享，每次返回深拷贝，调用方修改不会影响后续加载
+_YAML_CACHE: Dict[tuple, Any] = {}
+
+
+def _load_yaml_cached(yaml_file: Path) -> Any:
+    """读取并解析YAML文件，命中缓存时返回上次解析结果的副本"""
+    st = yaml_file.stat()
+    key = (str(yaml_file.resolve()), st.st_mtime_ns, st.st_size)
+    if key in _YAML_CACHE:
+        data = _YAML_CACHE[key]
+    else:
+        with open(yaml_file, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=_YAML_LOADER)
+        _YAML_CACHE[key] = data
+    return copy.deepcopy(data)
+
+
+def _intern(value: Any) -> Any:
+    """驻留字符串取值，非字符串原样返回"""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True, frozen=True)
 class ExtractionRule:
     """单个提取规则"""
     name: str
@@ -21,6 +53,19 @@ class ExtractionRule:
     params: Dict[str, Any] = field(default_factory=dict)
     priority: int = 100
     enabled: bool = True
+    # 加载时预编译的 pattern，非法正则为 None（匹配时跳过该规则）
+    compiled: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # 冻结的数据类只能绕过 __setattr__ 写入派生字段；
+        # 规则名和类型取值重复度高，驻留后字典键比较可直接按对象判等
+        for attr in ('name', 'rule_type', 'action'):
+            object.__setattr__(self, attr, _intern(getattr(self, attr)))
+        try:
+            compiled = re.compile(self.pattern)
+        except (re.error, TypeError):
+            compiled = None
+        object.__setattr__(self, 'compiled', compiled)
 
 
 @dataclass
@@ -42,6 +87,15 @@ class ProductProfile:
     # 默认参数
     default_fields: List[str] = field(default_factory=list)
     skip_patterns: List[str] = field(default_factory=list)
+    url_patterns: List[str] = field(default_factory=list)
+    
+    # url_patterns 合并预编译后的正则（忽略大小写），没有可用模式时为 None
+    url_regex: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+    # 规则列表经 update_rule 修改后递增，缓存了合并规则的调用方据此判断是否需要重建
+    revision: int = field(default=0, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.url_regex = _compile_url_patterns(self.name, self.url_patterns)
     
     def merge_with_parent(self, parent: 'ProductProfile'):
         """继承父配置并合并"""
@@ -49,26 +103,104 @@ class ProductProfile:
             return
         
         # 父规则优先级低，子规则覆盖
-        self.table_detection_rules = (
-            parent.table_detection_rules + 
-            [r for r in self.table_detection_rules if r.name not in 
-             {pr.name for pr in parent.table_detection_rules}]
-        )
-        self.param_mapping_rules = (
-            parent.param_mapping_rules + 
-            [r for r in self.param_mapping_rules if r.name not in 
-             {pr.name for pr in parent.param_mapping_rules}]
-        )
-        # ... 其他规则集同样处理
+        self.table_detection_rules = _merge_rules(
+            parent.table_detection_rules, self.table_detection_rules)
+        self.param_mapping_rules = _merge_rules(
+            parent.param_mapping_rules, self.param_mapping_rules)
+        self.value_extraction_rules = _merge_rules(
+            parent.value_extraction_rules, self.value_extraction_rules)
+        self.post_processing_rules = _merge_rules(
+            parent.post_processing_rules, self.post_processing_rules)
+
+
+def _rule_to_dict(rule: ExtractionRule) -> Dict[str, Any]:
+    """规则保存时写入的字段（不含 enabled 和预编译结果）"""
+    return {
+        'name': rule.name,
+        'pattern': rule.pattern,
+        'rule_type': rule.rule_type,
+        'action': rule.action,
+        'params': rule.params,
+        'priority': rule.priority
+    }
+
+
+def _merge_rules(parent_rules: List[ExtractionRule],
+                 child_rules: List[ExtractionRule]) -> List[ExtractionRule]:
+    """按规则名合并：父规则在前，同名子规则替换父规则并保留其位置"""
+    merged = {r.name: r for r in parent_rules}
+    merged.update((r.name, r) for r in child_rules)
+    return list(merged.values())
+
+
+# 规则模式开头的全局内联标志，合并时需改写为作用域标志 (?i:...)
+_LEADING_FLAGS_RE = re.compile(r'^\(\?([aiLmsux]+)\)')
+# 编号/命名反向引用和条件组引用 (?(1)...) / (?(name)...) 在合并后组号会错位，含有它们的规则集不做合并
+_BACKREF_RE = re.compile(r'\\[1-9]\d*|\(\?P=|\(\?\(')
+
+
+def compile_rule_union(rules: List[ExtractionRule]) -> Optional[re.Pattern]:
+    """
+    把一组规则合并为单个正则，一次匹配即可找出最先命中的规则
+    
+    每条规则包装为前瞻分支 (?=任意前缀(?P<_ruleN>规则模式)) 并按列表顺序串联，在文本开头 match 时
+    依次尝试各分支，效果等同于按顺序对每条规则 search。命中的规则序号由
+    m.lastgroup 的 "_ruleN" 给出。无法安全合并时返回 None，调用方应逐条匹配。
+    """
+    alternatives = []
+    for i, rule in enumerate(rules):
+        pattern = rule.pattern
+        if _BACKREF_RE.search(pattern):
+            return None
+        pattern = _scope_leading_flags(pattern)
+        alternatives.append(f"(?=[\\s\\S]*?(?P<_rule{i}>{pattern}))")
+    
+    try:
+        return re.compile('|'.join(alternatives))
+    except re.error:
+        return None
+
+
+def _scope_leading_flags(pattern: str) -> str:
+    """把开头的全局内联标志 (?i) 改写为作用域形式 (?i:...)，以便拼入更大的正则"""
+    flags = _LEADING_FLAGS_RE.match(pattern)
+    if flags:
+        return f"(?{flags.group(1)}:{pattern[flags.end():]})"
+    return pattern
+
+
+def _compile_url_patterns(profile_name: str, patterns: List[str]) -> Optional[re.Pattern]:
+    """把配置的 url_patterns 合并为一个忽略大小写的正则，任一模式命中即匹配"""
+    valid = []
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except (re.error, TypeError) as e:
+            print(f"Invalid url pattern {pattern!r} in profile {profile_name}: {e}")
+            continue
+        valid.append(f"(?:{_scope_leading_flags(pattern)})")
+    if not valid:
+        return None
+    
+    try:
+        return re.compile('|'.join(valid), re.IGNORECASE)
+    except re.error as e:
+        print(f"Cannot combine url patterns of profile {profile_name}: {e}")
+        return None
 
 
 class RuleEngine:
     """规则引擎 - 核心控制器"""
     
+    # 配置文件数达到该值时使用线程池并行加载
+    PARALLEL_LOAD_THRESHOLD = 4
+    
     def __init__(self, config_dir: str = "config"):
         self.config_dir = Path(config_dir)
         self.profiles: Dict[str, ProductProfile] = {}
         self.global_rules: Dict[str, List[ExtractionRule]] = {}
+        # 所有配置 url_patterns 的合并正则 (正则, 配置名列表)，配置变动后置空、按需重建
+        self._url_union: Optional[tuple] = None
         self._load_all_configs()
     
     def _load_all_configs(self):
@@ -79,10 +211,38 @@ class RuleEngine:
         # 加载产品配置文件
         profile_dir = self.config_dir / "profiles"
         if profile_dir.exists():
-            for yaml_file in profile_dir.glob("*.yaml"):
-                profile = self._load_profile(yaml_file)
+            yaml_files = list(profile_dir.glob("*.yaml"))
+            # 文件较多时并行读取和解析；map 保持原有顺序
+            if len(yaml_files) >= self.PARALLEL_LOAD_THRESHOLD:
+                workers = min(8, os.cpu_count() or 4)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    profiles = list(executor.map(self._load_profile, yaml_files))
+            else:
+                profiles = [self._load_profile(f) for f in yaml_files]
+            
+            for profile in profiles:
                 if profile:
                     self.profiles[profile.name] = profile
+            
+            # 继承关系依赖其他配置，全部加载后再串行合并
+            self._merge_parent_profiles()
+    
+    def _merge_parent_profiles(self):
+        """按继承链合并父配置，父配置先于子配置完成合并，与文件加载顺序无关"""
+        merged = set()
+        
+        def merge(name: str, chain: set):
+            if name in merged:
+                return
+            profile = self.profiles[name]
+            parent_name = profile.parent_profile
+            if parent_name and parent_name in self.profiles and parent_name not in chain:
+                merge(parent_name, chain | {name})
+                profile.merge_with_parent(self.profiles[parent_name])
+            merged.add(name)
+        
+        for name in self.profiles:
+            merge(name, set())
     
     def _load_global_rules(self):
         """加载全局规则"""
@@ -93,36 +253,34 @@ class RuleEngine:
         # 加载表格检测规则
         table_rules_file = rules_dir / "table_detection.yaml"
         if table_rules_file.exists():
-            with open(table_rules_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                self.global_rules['table_detection'] = [
-                    ExtractionRule(**rule) for rule in data.get('rules', [])
-                ]
+            data = _load_yaml_cached(table_rules_file)
+            self.global_rules['table_detection'] = [
+                ExtractionRule(**rule) for rule in data.get('rules', [])
+            ]
         
         # 加载参数映射规则
         mapping_file = rules_dir / "param_mappings.yaml"
         if mapping_file.exists():
-            with open(mapping_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                self.global_rules['param_mapping'] = [
-                    ExtractionRule(**rule) for rule in data.get('rules', [])
-                ]
+            data = _load_yaml_cached(mapping_file)
+            self.global_rules['param_mapping'] = [
+                ExtractionRule(**rule) for rule in data.get('rules', [])
+            ]
     
     def _load_profile(self, yaml_file: Path) -> Optional[ProductProfile]:
         """加载单个配置文件"""
         try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = _load_yaml_cached(yaml_file)
             
             profile = ProductProfile(
                 name=data.get('name', yaml_file.stem),
-                brand=data.get('brand', 'Unknown'),
-                product_type=data.get('product_type', 'unknown'),
-                sub_type=data.get('sub_type', 'unknown'),
+                brand=_intern(data.get('brand', 'Unknown')),
+                product_type=_intern(data.get('product_type', 'unknown')),
+                sub_type=_intern(data.get('sub_type', 'unknown')),
                 version=data.get('version', '1.0'),
                 parent_profile=data.get('parent_profile'),
                 default_fields=data.get('default_fields', []),
-                skip_patterns=data.get('skip_patterns', [])
+                skip_patterns=data.get('skip_patterns', []),
+                url_patterns=data.get('url_patterns', [])
             )
             
             # 加载各类规则
@@ -135,10 +293,6 @@ class RuleEngine:
                 for rule in data.get('param_mapping_rules', [])
             ]
             
-            # 如果有父配置，合并
-            if profile.parent_profile and profile.parent_profile in self.profiles:
-                profile.merge_with_parent(self.profiles[profile.parent_profile])
-            
             return profile
             
         except Exception as e:
@@ -147,18 +301,45 @@ class RuleEngine:
     
     def detect_profile(self, url: str, html_sample: str) -> Optional[str]:
         """根据URL和HTML样本检测适用的配置"""
-        # URL模式匹配
-        for name, profile in self.profiles.items():
-            url_patterns = profile.default_fields.get('url_patterns', [])
-            for pattern in url_patterns:
-                if re.search(pattern, url, re.IGNORECASE):
-                    return name
+        # URL模式匹配：按配置加载顺序，返回第一个命中的配置
+        if self._url_union is None:
+            self._url_union = self._build_url_union()
+        union, names = self._url_union
+        if union is not None:
+            m = union.match(url)
+            return names[int(m.lastgroup[8:])] if m else None
+        
+        for name in names:
+            if self.profiles[name].url_regex.search(url):
+                return name
         
         # HTML特征匹配
         # TODO: 实现更智能的检测
         
         return None
     
+    def _build_url_union(self) -> tuple:
+        """
+        把各配置的URL正则合并为一个，一次匹配即可确定命中的配置
+        
+        与 compile_rule_union 相同，每个配置包装为前瞻分支并按加载顺序串联，
+        保证与逐个配置 search 的结果一致。含反向引用或无法合并时返回 (None, 配置名列表)。
+        """
+        names = [name for name, p in self.profiles.items() if p.url_regex is not None]
+        alternatives = []
+        for i, name in enumerate(names):
+            pattern = self.profiles[name].url_regex.pattern
+            if _BACKREF_RE.search(pattern):
+                return None, names
+            alternatives.append(f"(?=[\\s\\S]*?(?P<_profile{i}>(?i:{pattern})))")
+        if not alternatives:
+            return None, names
+        
+        try:
+            return re.compile('|'.join(alternatives)), names
+        except re.error:
+            return None, names
+    
     def get_profile(self, name: str) -> Optional[ProductProfile]:
         """获取指定配置"""
         return self.profiles.get(name)
@@ -179,6 +360,7 @@ class RuleEngine:
     def add_profile(self, profile: ProductProfile, save: bool = True):
         """添加新配置（累加）"""
         self.profiles[profile.name] = profile
+        self._url_union = None
         
         if save:
             self._save_profile(profile)
@@ -199,32 +381,13 @@ class RuleEngine:
             'parent_profile': profile.parent_profile,
             'default_fields': profile.default_fields,
             'skip_patterns': profile.skip_patterns,
-            'table_detection_rules': [
-                {
-                    'name': r.name,
-                    'pattern': r.pattern,
-                    'rule_type': r.rule_type,
-                    'action': r.action,
-                    'params': r.params,
-                    'priority': r.priority
-                }
-                for r in profile.table_detection_rules
-            ],
-            'param_mapping_rules': [
-                {
-                    'name': r.name,
-                    'pattern': r.pattern,
-                    'rule_type': r.rule_type,
-                    'action': r.action,
-                    'params': r.params,
-                    'priority': r.priority
-                }
-                for r in profile.param_mapping_rules
-            ]
+            'url_patterns': profile.url_patterns,
+            'table_detection_rules': [_rule_to_dict(r) for r in profile.table_detection_rules],
+            'param_mapping_rules': [_rule_to_dict(r) for r in profile.param_mapping_rules]
         }
         
         with open(file_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, allow_unicode=True, sort_keys=False)
+            yaml.dump(data, f, Dumper=_YAML_DUMPER, allow_unicode=True, sort_keys=False)
     
     def update_rule(self, profile_name: str, rule_type: str, rule: ExtractionRule):
         """更新指定配置的规则（累加更新）"""
@@ -246,6 +409,7 @@ class RuleEngine:
         else:
             # 添加新规则
             rule_list.append(rule)
+        profile.revision += 1
         
         # 保存更新
         self._save_profile(profile)
@@ -253,10 +417,13 @@ class RuleEngine:
 
 # 全局规则引擎实例
 _default_engine = None
+_engine_lock = threading.Lock()
 
 def get_rule_engine(config_dir: str = "config") -> RuleEngine:
-    """获取规则引擎单例"""
+    """获取规则引擎单例（双重检查加锁，多线程并发首次调用时只加载一次配置）"""
     global _default_engine
     if _default_engine is None:
-        _default_engine = RuleEngine(config_dir)
+        with _engine_lock:
+            if _default_engine is None:
+                _default_engine = RuleEngine(config_dir)
     return _default_engine
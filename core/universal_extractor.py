@@ -5,19 +5,56 @@
 
 import re
 import sys
+from itertools import islice
 from typing import Dict, List, Optional, Any
-from bs4 import BeautifulSoup, Tag
 from pathlib import Path
+from lxml import etree
 
-# 导入规则引擎
-sys.path.insert(0, str(Path(__file__).parent))
-from rule_engine import get_rule_engine, ProductProfile, ExtractionRule
-from page_analyzer import PageAnalyzer, PageAnalysisReport
+# 导入规则引擎（与包内其他模块共用同一个 rule_engine 模块，规则引擎单例只加载一次配置）
+from .rule_engine import get_rule_engine, ProductProfile, ExtractionRule, compile_rule_union
+from .page_analyzer import PageAnalyzer, PageAnalysisReport
+from html_utils import TABLE_OPEN_RE, element_text, parse_document, row_cells
+
+
+_direct_extractor = None
+
+
+def _get_direct_extractor():
+    """首次使用时才导入 scripts/direct_extractor；其表格提取方法不修改实例状态，全部共用一个实例"""
+    global _direct_extractor
+    if _direct_extractor is None:
+        from direct_extractor import DirectTableExtractor
+        extractor = DirectTableExtractor()
+        # 跳过规则在共享前编译好，多线程并发调用时不会再改写实例状态
+        extractor._compile_skip_patterns()
+        _direct_extractor = extractor
+    return _direct_extractor
+
+
+# 区分“字段不存在”与字段值为None
+_MISSING = object()
+
+# 表格行只取表格自身（含thead/tbody/tfoot分节）的行，按文档顺序返回，不再深入嵌套表格
+_table_rows = etree.XPath('tr|thead/tr|tbody/tr|tfoot/tr')
+
+
+# 型号描述模式：型号 + 冒号 + 端口描述
+_DESCRIPTION_PATTERNS = (
+    re.compile(r'(S\d{4}[A-Z]*-[\w-]+):\s*([0-9x\s/]+(?:BASE-T|Ethernet|Ports|SFP)[^\n;]+?)(?=\n|S\d{4}|$)', re.IGNORECASE),
+    re.compile(r'(S\d{4}[A-Z]*-[\w-]+)\s*[:：]\s*([^\n]+?)(?=\n|S\d{4}|$)', re.IGNORECASE),
+)
+
+# 型号名称模式（两种写法合并为一个正则，均从开头匹配）
+_MODEL_NAME_RE = re.compile(r'S\d{4}[A-Z]*-[\w-]+|[A-Z]{2,}\d{3,}')
 
 
 class UniversalExtractor:
     """通用产品规格提取器"""
     
+    # 框式交换机的型号前缀与特有参数
+    _CHASSIS_PREFIXES = ('S125', 'S105', 'S76', 'S75', 'S95', 'S98')
+    _CHASSIS_PARAMS = ('业务板槽位', '主控板槽位', '接口板槽位')
+    
     def __init__(self, profile_name: str = None, config_dir: str = "config"):
         """
         Args:
@@ -34,6 +71,23 @@ class UniversalExtractor:
         self.extracted_data: Dict[str, Dict] = {}
         self.analysis_report: Optional[PageAnalysisReport] = None
         self.warnings: List[str] = []
+        
+        # 表格类型 -> 专用提取器
+        self._extractors = {
+            'poe_power': self._extract_poe_table,
+            'software': self._extract_software_table,
+            'performance': self._extract_performance_table,
+            'protocols': self._extract_protocols_table,
+        }
+        
+        # 合并后的规则匹配器 {规则类别: (合并正则, 规则列表)}，配置确定后按需构建
+        self._rules_profile: Optional[ProductProfile] = None
+        self._rules_revision = -1  # 构建匹配器时配置的 revision
+        self._rule_matchers: Dict[str, tuple] = {}
+        # 参数名映射结果缓存 {原始参数名: 映射名}，同一配置下同名表头只匹配一次
+        self._param_names: Dict[str, Optional[str]] = {}
+        # 系列特性的过滤正则 (构建时的配置, 合并正则)
+        self._skip_re: Optional[tuple] = None
     
     def extract(self, html: str, url: str = "", auto_detect: bool = True) -> Dict[str, Dict]:
         """
@@ -62,136 +116,160 @@ class UniversalExtractor:
             self.warnings.append(f"No profile found for {url}, using default")
             self.profile = self._create_default_profile()
         
-        # 3. 解析HTML
-        soup = BeautifulSoup(html, 'lxml')
-        tables = soup.find_all('table')
+        # 配置或其规则变化时才重新合并规则，同一配置连续提取多个页面时沿用已构建的匹配器
+        if self.profile is not self._rules_profile or self.profile.revision != self._rules_revision:
+            self._rules_profile = self.profile
+            self._rules_revision = self.profile.revision
+            self._rule_matchers = {}
+            self._param_names = {}
         
-        # 4. 提取系列级信息
-        series_data = {}
-        model_descriptions = self._extract_model_descriptions(soup)
-        series_features = self._extract_series_features(soup)
+        # 3. 解析HTML（页面中没有<table>标签时不会产生型号，也没有已有型号要补字段，整页不必解析）
+        doc = None
+        if self.extracted_data or TABLE_OPEN_RE.search(html or ''):
+            doc = parse_document(html)
+        tables = list(doc.iter('table')) if doc is not None else []
         
-        # 5. 处理每个表格
+        # 4. 处理每个表格
+        series_data = {}
         for i, table in enumerate(tables):
             table_data = self._process_table_with_rules(table, i, url)
             if table_data:
                 self._merge_table_data(table_data, series_data)
         
-        # 6. 后处理
+        # 5. 后处理
         self._apply_post_processing()
         
-        # 7. 添加通用字段
-        for model_name in self.extracted_data:
-            # 添加URL
-            self.extracted_data[model_name]['链接地址'] = url
-            
-            # 添加型号描述
-            if model_name in model_descriptions:
-                self.extracted_data[model_name]['型号描述'] = model_descriptions[model_name]
-            
-            # 添加系列特性
-            if series_features:
-                self.extracted_data[model_name]['系列特性'] = series_features
+        # 6. 提取系列级信息（只用于补充已提取到的型号）
+        model_descriptions = {}
+        series_features = ''
+        if doc is not None and self.extracted_data:
+            model_descriptions = self._extract_model_descriptions(doc, self.extracted_data)
+            series_features = self._extract_series_features(doc)
+        
+        # 7. 添加通用字段（URL、型号描述、系列特性，字段顺序保持不变）
+        common = {'链接地址': url}
+        if series_features:
+            common['系列特性'] = series_features
+        
+        for model_name, specs in self.extracted_data.items():
+            desc = model_descriptions.get(model_name)
+            if desc is None:
+                specs.update(common)
+            else:
+                specs['链接地址'] = url
+                specs['型号描述'] = desc
+                if series_features:
+                    specs['系列特性'] = series_features
         
         return self.extracted_data
     
-    def _process_table_with_rules(self, table: Tag, index: int, url: str) -> Optional[Dict[str, Dict]]:
+    def _process_table_with_rules(self, table, index: int, url: str) -> Optional[Dict[str, Dict]]:
         """使用规则处理表格"""
-        text = table.get_text(strip=True)
+        # 跳过小表格：先用libxml2序列化出的原始文本字节数粗筛（不小于去除空白后的字符数），
+        # 明显过小的表格不必在Python中逐段拼接文本
+        if len(etree.tostring(table, method='text', encoding='utf-8', with_tail=False)) < 200:
+            return None
         
-        # 跳过小表格
+        text = element_text(table)
         if len(text) < 200:
             return None
         
-        # 1. 检测表格类型（使用规则）
-        table_type = self._detect_table_type_with_rules(text)
-        
-        # 2. 解析表格结构
+        # 1. 解析表格结构
         headers, rows = self._parse_table_structure(table)
         if not headers or not rows:
             return None
         
-        # 3. 根据类型选择提取器
-        if table_type == 'poe_power':
-            return self._extract_poe_table(headers, rows)
-        elif table_type == 'software':
-            return self._extract_software_table(headers, rows)
-        elif table_type == 'performance':
-            return self._extract_performance_table(headers, rows)
-        elif table_type == 'protocols':
-            return self._extract_protocols_table(headers, rows)
-        elif self._is_multi_model_table(headers):
-            return self._extract_multi_model_table(headers, rows)
-        else:
-            return self._extract_generic_table(headers, rows)
-    
-    def _detect_table_type_with_rules(self, text: str) -> str:
-        """使用规则检测表格类型"""
-        text_lower = text.lower()
-        
-        # 使用配置文件中的规则
-        if self.profile:
-            for rule in sorted(self.profile.table_detection_rules, 
-                             key=lambda r: r.priority, reverse=True):
-                if not rule.enabled:
-                    continue
-                try:
-                    if re.search(rule.pattern, text_lower):
-                        return rule.params.get('extractor', 'generic')
-                except re.error:
-                    continue
+        # 2. 检测表格类型（使用规则，文本只转一次小写）
+        table_type = self._detect_table_type_with_rules(text.lower())
         
-        # 使用全局规则
-        for rule in sorted(self.engine.global_rules.get('table_detection', []),
-                         key=lambda r: r.priority, reverse=True):
-            if not rule.enabled:
-                continue
-            try:
-                if re.search(rule.pattern, text_lower):
-                    return rule.params.get('extractor', 'generic')
-            except re.error:
-                continue
+        # 3. 根据类型选择提取器，其余类型按表头区分多型号表格和通用表格
+        extractor = self._extractors.get(table_type)
+        if extractor is None:
+            if self._is_multi_model_table(headers):
+                extractor = self._extract_multi_model_table
+            else:
+                extractor = self._extract_generic_table
+        return extractor(headers, rows)
+    
+    def _detect_table_type_with_rules(self, text_lower: str) -> str:
+        """使用规则检测表格类型（text_lower 需已转为小写）"""
+        # 配置文件规则优先，其次全局规则，各自按优先级排序
+        rule = self._match_rule('table_detection', text_lower)
+        if rule is not None:
+            return rule.params.get('extractor', 'generic')
         
         # 默认检测逻辑
-        return self._fallback_table_detection(text)
+        return self._fallback_table_detection(text_lower)
     
-    def _fallback_table_detection(self, text: str) -> str:
-        """后备表格检测"""
-        text_lower = text.lower()
+    def _match_rule(self, category: str, text: str) -> Optional[ExtractionRule]:
+        """返回最先命中文本的规则（配置文件规则在前、全局规则在后，各自按优先级降序）"""
+        matcher = self._rule_matchers.get(category)
+        if matcher is None:
+            matcher = self._build_rule_matcher(category)
+            self._rule_matchers[category] = matcher
+        
+        union, rules = matcher
+        if union is not None:
+            m = union.match(text)
+            return rules[int(m.lastgroup[5:])] if m else None
+        
+        # 规则无法合并时逐条匹配
+        for rule in rules:
+            if rule.compiled.search(text):
+                return rule
+        return None
+    
+    def _build_rule_matcher(self, category: str) -> tuple:
+        """收集可用规则并合并为单个正则"""
+        profile_rules = getattr(self.profile, f"{category}_rules", []) if self.profile else []
+        global_rules = self.engine.global_rules.get(category, [])
+        
+        rules = []
+        for rule_set in (profile_rules, global_rules):
+            for rule in sorted(rule_set, key=lambda r: r.priority, reverse=True):
+                if not rule.enabled or rule.compiled is None:
+                    continue
+                if category == 'param_mapping' and rule.action != 'map_to':
+                    continue
+                rules.append(rule)
         
+        return compile_rule_union(rules) if rules else None, rules
+    
+    def _fallback_table_detection(self, text_lower: str) -> str:
+        """后备表格检测（text_lower 需已转为小写）"""
         if 'organization' in text_lower and 'ieee' in text_lower:
             return 'protocols'
         elif 'poe power capacity' in text_lower and 'quantity' in text_lower:
             return 'poe_power'
-        elif any(x in text_lower for x in ['mac address entries', 'vlan table']):
+        elif 'mac address entries' in text_lower or 'vlan table' in text_lower:
             return 'performance'
         elif 'software' in text_lower and ('vlan' in text_lower or 'routing' in text_lower):
             return 'software'
         
         return 'hardware'
     
-    def _parse_table_structure(self, table: Tag) -> tuple:
+    def _parse_table_structure(self, table) -> tuple:
         """解析表格结构"""
-        # 查找表头
+        all_rows = _table_rows(table)
+        
+        # 查找表头（表头会作为每一行的字典键，驻留后各行共用同一字符串对象）
         headers = []
         thead = table.find('thead')
-        if thead:
+        if thead is not None:
             header_row = thead.find('tr')
-            if header_row:
-                headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
+            if header_row is not None:
+                headers = [sys.intern(element_text(th)) for th in row_cells(header_row)]
         
-        if not headers:
+        if not headers and all_rows:
             # 尝试第一行作为表头
-            first_row = table.find('tr')
-            if first_row:
-                headers = [cell.get_text(strip=True) for cell in first_row.find_all(['th', 'td'])]
+            headers = [sys.intern(element_text(cell)) for cell in row_cells(all_rows[0])]
         
         # 解析数据行
         rows = []
-        data_rows = table.find_all('tr')[1:] if headers else table.find_all('tr')
+        data_rows = all_rows[1:] if headers else all_rows
         
         for tr in data_rows:
-            cells = tr.find_all(['td', 'th'])
+            cells = row_cells(tr)
             if len(cells) >= 2:
                 row_data = {}
                 for i, cell in enumerate(cells):
@@ -201,109 +279,94 @@ class UniversalExtractor:
                         if rowspan:
                             # 简化处理，实际应该缓存rowspan值
                             pass
-                        row_data[headers[i]] = cell.get_text(strip=True)
+                        row_data[headers[i]] = element_text(cell)
                 if row_data:
                     rows.append(row_data)
         
         return headers, rows
     
-    def _extract_model_descriptions(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """提取型号描述"""
+    def _extract_model_descriptions(self, doc, models=None) -> Dict[str, str]:
+        """
+        提取型号描述
+        
+        Args:
+            doc: 已解析的页面
+            models: 只需要这些型号的描述，全部找到后即停止扫描；None表示收集所有型号
+        """
         descriptions = {}
-        text_content = soup.get_text()
-        
-        # 使用配置中的模式
-        patterns = [
-            r'(S\d{4}[A-Z]*-[\w-]+):\s*([0-9x\s/]+(?:BASE-T|Ethernet|Ports|SFP)[^\n;]+?)(?=\n|S\d{4}|$)',
-            r'(S\d{4}[A-Z]*-[\w-]+)\s*[:：]\s*([^\n]+?)(?=\n|S\d{4}|$)',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            for model, desc in matches:
-                model = model.strip()
-                desc = desc.strip()
+        # 整页文本交给libxml2序列化，结果与 ''.join(doc.itertext()) 相同，不必在Python中逐段拼接
+        text_content = etree.tostring(doc, method='text', encoding='unicode', with_tail=False)
+        wanted = None
+        if models is not None:
+            # 型号分组不含空白，能匹配上的型号必定原样出现在文本中；一个都不出现时不必运行正则
+            wanted = {m for m in models if m in text_content}
+            if not wanted:
+                return descriptions
+        
+        for pattern in _DESCRIPTION_PATTERNS:
+            for match in pattern.finditer(text_content):
+                model = match.group(1).strip()
+                desc = match.group(2).strip()
                 if len(desc) > 10 and len(desc) < 200:
-                    if model not in descriptions:
+                    if model not in descriptions and (wanted is None or model in wanted):
                         descriptions[model] = desc
+                        if wanted is not None and len(descriptions) == len(wanted):
+                            return descriptions
         
         return descriptions
     
-    def _extract_series_features(self, soup: BeautifulSoup) -> str:
+    def _extract_series_features(self, doc) -> str:
         """提取系列特性"""
-        features = []
-        
-        # 使用配置中的skip patterns
-        skip_patterns = self.profile.skip_patterns if self.profile else []
-        
-        headers = soup.find_all(['h2', 'h3'])
-        first_table = soup.find('table')
+        features = {}  # 按出现顺序去重
+        skip_re = self._skip_pattern_re()
         
-        for h in headers:
-            text = h.get_text(strip=True)
+        for h in doc.iter('h2', 'h3'):
+            text = element_text(h)
             if len(text) > 80 or len(text) < 5:
                 continue
             
-            text_lower = text.lower()
-            
             # 跳过过滤模式
-            if any(sp in text_lower for sp in skip_patterns):
-                continue
-            
-            if 'continued' in text_lower:
+            if skip_re.search(text.lower()):
                 continue
             
-            if text and text not in features:
-                features.append(text)
+            features[text] = None
         
-        return '; '.join(features) if features else ''
+        return '; '.join(features)
+    
+    def _skip_pattern_re(self):
+        """配置中的skip patterns与'continued'合并为一个正则（在已转小写的文本上匹配，随配置缓存）"""
+        profile = self.profile
+        cached = self._skip_re
+        if cached is None or cached[0] is not profile:
+            patterns = list(profile.skip_patterns) if profile else []
+            patterns.append('continued')
+            cached = (profile, re.compile('|'.join(map(re.escape, patterns))))
+            self._skip_re = cached
+        return cached[1]
     
     def _is_multi_model_table(self, headers: List[str]) -> bool:
         """判断是否多型号表格"""
         return len(headers) > 2 and any(
-            self._is_model_name(h) for h in headers[1:]
+            _MODEL_NAME_RE.match(h) for h in islice(headers, 1, None) if h
         )
     
     def _is_model_name(self, text: str) -> bool:
         """判断是否为型号名称"""
         if not text:
             return False
-        patterns = [
-            r'^S\d{4}[A-Z]*-[\w-]+',
-            r'^[A-Z]{2,}\d{3,}',
-        ]
-        return any(re.match(p, text) for p in patterns)
+        return _MODEL_NAME_RE.match(text) is not None
     
     def _normalize_param_name(self, param: str) -> Optional[str]:
         """使用规则映射参数名"""
-        param_lower = param.lower()
-        
-        # 使用配置文件规则
-        if self.profile:
-            for rule in sorted(self.profile.param_mapping_rules,
-                             key=lambda r: r.priority, reverse=True):
-                if not rule.enabled:
-                    continue
-                try:
-                    if re.search(rule.pattern, param_lower):
-                        if rule.action == 'map_to':
-                            return rule.params.get('target')
-                except re.error:
-                    continue
-        
-        # 使用全局规则
-        for rule in sorted(self.engine.global_rules.get('param_mapping', []),
-                         key=lambda r: r.priority, reverse=True):
-            if not rule.enabled:
-                continue
-            try:
-                if re.search(rule.pattern, param_lower):
-                    if rule.action == 'map_to':
-                        return rule.params.get('target')
-            except re.error:
-                continue
-        
-        return None
+        target = self._param_names.get(param, _MISSING)
+        if target is not _MISSING:
+            return target
+        
+        # 只有 map_to 规则会产生映射结果，其余动作的规则命中后也不返回
+        rule = self._match_rule('param_mapping', param.lower())
+        target = rule.params.get('target') if rule is not None else None
+        self._param_names[param] = target
+        return target
     
     def _apply_post_processing(self):
         """应用后处理规则"""
@@ -312,38 +375,33 @@ class UniversalExtractor:
         
         for model_name, specs in self.extracted_data.items():
             # 合并1G端口数到1000Base-T端口数
-            if '1G端口数' in specs and '1000Base-T端口数' not in specs:
-                specs['1000Base-T端口数'] = specs['1G端口数']
-            if '1G端口数' in specs:
-                del specs['1G端口数']
+            ports_1g = specs.pop('1G端口数', _MISSING)
+            if ports_1g is not _MISSING:
+                specs.setdefault('1000Base-T端口数', ports_1g)
             
             # 合并POE功率
+            poe_ac = specs.pop('POE总功率_AC', _MISSING)
+            poe_dc = specs.pop('POE总功率_DC', _MISSING)
             poe_parts = []
-            if 'POE总功率_AC' in specs:
-                poe_parts.append(f"AC:{specs['POE总功率_AC']}W")
-            if 'POE总功率_DC' in specs:
-                poe_parts.append(f"DC:{specs['POE总功率_DC']}W")
-            if poe_parts and 'POE总功率' not in specs:
-                specs['POE总功率'] = '/'.join(poe_parts)
-            if 'POE总功率_AC' in specs:
-                del specs['POE总功率_AC']
-            if 'POE总功率_DC' in specs:
-                del specs['POE总功率_DC']
+            if poe_ac is not _MISSING:
+                poe_parts.append(f"AC:{poe_ac}W")
+            if poe_dc is not _MISSING:
+                poe_parts.append(f"DC:{poe_dc}W")
+            if poe_parts:
+                specs.setdefault('POE总功率', '/'.join(poe_parts))
             
             # 分类交换机类型
             specs['交换机类型'] = self._classify_switch_type(model_name, specs)
     
     def _classify_switch_type(self, model_name: str, specs: Dict) -> str:
         """分类交换机类型"""
-        chassis_prefixes = ['S125', 'S105', 'S76', 'S75', 'S95', 'S98']
-        for prefix in chassis_prefixes:
-            if model_name.startswith(prefix):
-                return '框式交换机'
+        if model_name.startswith(self._CHASSIS_PREFIXES):
+            return '框式交换机'
         
-        chassis_params = ['业务板槽位', '主控板槽位', '接口板槽位']
-        for param in specs:
-            if any(cp in param for cp in chassis_params):
-                return '框式交换机'
+        # 参数名拼成一个字符串后逐个查找，分隔符不会出现在特有参数中
+        keys = '\x01'.join(specs)
+        if any(cp in keys for cp in self._CHASSIS_PARAMS):
+            return '框式交换机'
         
         return '盒式交换机'
     
@@ -361,15 +419,16 @@ class UniversalExtractor:
                     self.extracted_data[model_name] = {}
                 self.extracted_data[model_name].update(specs)
         
-        # 合并系列数据到所有型号
+        # 合并系列数据到所有型号（各系列条目先按顺序合成一份，每个型号只更新一次）
         if series_data and self.extracted_data:
-            for series_key, series_specs in series_data.items():
-                for model_name in self.extracted_data:
-                    self.extracted_data[model_name].update(series_specs)
+            combined_series = {}
+            for series_specs in series_data.values():
+                combined_series.update(series_specs)
+            for specs in self.extracted_data.values():
+                specs.update(combined_series)
     
     def _create_default_profile(self) -> ProductProfile:
         """创建默认配置"""
-        from rule_engine import ProductProfile
         return ProductProfile(
             name="Default",
             brand="Unknown",
@@ -380,34 +439,22 @@ class UniversalExtractor:
     # ... 其他提取器方法（保持与之前相同）...
     def _extract_poe_table(self, headers, rows):
         # 保持原有实现
-        from .direct_extractor import DirectTableExtractor
-        extractor = DirectTableExtractor()
-        return extractor._extract_poe_table(headers, rows)
+        return _get_direct_extractor()._extract_poe_table(headers, rows)
     
     def _extract_software_table(self, headers, rows):
-        from .direct_extractor import DirectTableExtractor
-        extractor = DirectTableExtractor()
-        return extractor._extract_software_table(headers, rows)
+        return _get_direct_extractor()._extract_software_table(headers, rows)
     
     def _extract_performance_table(self, headers, rows):
-        from .direct_extractor import DirectTableExtractor
-        extractor = DirectTableExtractor()
-        return extractor._extract_performance_table(headers, rows)
+        return _get_direct_extractor()._extract_performance_table(headers, rows)
     
     def _extract_protocols_table(self, headers, rows):
-        from .direct_extractor import DirectTableExtractor
-        extractor = DirectTableExtractor()
-        return extractor._extract_protocols_table(headers, rows)
+        return _get_direct_extractor()._extract_protocols_table(headers, rows)
     
     def _extract_multi_model_table(self, headers, rows):
-        from .direct_extractor import DirectTableExtractor
-        extractor = DirectTableExtractor()
-        return extractor._extract_multi_model_table(headers, rows)
+        return _get_direct_extractor()._extract_multi_model_table(headers, rows)
     
     def _extract_generic_table(self, headers, rows):
-        from .direct_extractor import DirectTableExtractor
-        extractor = DirectTableExtractor()
-        return extractor._extract_generic_table(headers, rows)
+        return _get_direct_extractor()._extract_generic_table(headers, rows)
     
     def get_analysis_report(self) -> Optional[PageAnalysisReport]:
         """获取分析报告"""
@@ -5,13 +5,35 @@ Visual Structure Analyzer - 视觉结构分析器
 
 import re
 import json
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Set
 from dataclasses import dataclass, field
-from bs4 import BeautifulSoup, Tag
-from collections import defaultdict
+from collections import Counter
+from itertools import islice
+from lxml import etree
 
+from html_utils import element_text, element_text_prefix, parse_document
 
-@dataclass
+
+# 预编译的内容统计模式
+_NUMBER_RE = re.compile(r'\d+')                                   # 区块中的数字
+_VALUE_UNIT_RE = re.compile(r'(\d+)\s*(Gbps|MHz|W|V|GB)')          # 数值+单位格式
+_TABLE_NUMBER_UNIT_RE = re.compile(r'\d+\s*(gbps|mhz|w|v)')        # 表格中的数值指标（小写文本）
+
+# 常见参数映射（按顺序匹配，已转小写的参数名）
+_PARAM_MAPPINGS = tuple((re.compile(pattern), chinese) for pattern, chinese in (
+    (r'port\s*switching\s*capacity', '交换容量'),
+    (r'forwarding\s*rate', '包转发率'),
+    (r'mac\s*address', 'MAC地址表'),
+    (r'vlan\s*table', 'VLAN表项'),
+    (r'dimension', '尺寸'),
+    (r'weight', '重量'),
+    (r'power\s*supply', '电源槽位数'),
+))
+# 任一映射模式的合并正则：一次扫描排除绝大多数无映射的参数名，命中后再按顺序确定映射
+_PARAM_MAPPINGS_ANY = re.compile('|'.join(pattern.pattern for pattern, _ in _PARAM_MAPPINGS))
+
+
+@dataclass(slots=True)
 class VisualBlock:
     """视觉区块"""
     block_type: str  # 'header', 'section', 'table', 'list', 'text'
@@ -42,13 +64,13 @@ class VisualBlock:
     param_mentions: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class ContentRegion:
     """内容区域 - 语义上的内容区块"""
     region_id: str
     region_type: str  # 'specifications', 'features', 'overview', 'models', 'unknown'
     title: Optional[str]
-    heading_element: Optional[Tag]
+    heading_element: Optional[Any]
     start_depth: int
     end_depth: int
     blocks: List[VisualBlock]
@@ -61,7 +83,7 @@ class ContentRegion:
     param_keywords: Set[str] = field(default_factory=set)
 
 
-@dataclass
+@dataclass(slots=True)
 class TableStructure:
     """表格结构分析"""
     table_index: int
@@ -94,7 +116,7 @@ class TableStructure:
     suggested_mappings: List[Dict]
 
 
-@dataclass
+@dataclass(slots=True)
 class SemanticPattern:
     """语义模式"""
     pattern_type: str  # 'model_naming', 'param_format', 'value_format', 'section_divider'
@@ -113,6 +135,9 @@ class VisualStructureAnalyzer:
         r'[A-Z]{2,}\d{3,}[A-Z]*-?[\w-]*',  # 通用型号格式
         r'\d{4}[A-Z]\d{2}[A-Z]*',  # 数字字母混合
     ]
+    _MODEL_RES = tuple(map(re.compile, MODEL_PATTERNS))  # 预编译，与 MODEL_PATTERNS 一一对应
+    # 任一型号模式的合并正则，只用于"是否包含型号"的判断
+    _MODEL_UNION = re.compile('|'.join(f'(?:{p})' for p in MODEL_PATTERNS))
     
     # 参数关键词
     PARAM_KEYWORDS = {
@@ -123,6 +148,12 @@ class VisualStructureAnalyzer:
         'memory': ['mac', 'vlan', 'routing', 'arp', 'table', 'entries', '表项'],
         'management': ['console', 'usb', 'management', 'console口', '管理'],
     }
+    # 展平并预先小写的 (类别, 原关键词, 小写关键词)，顺序与 PARAM_KEYWORDS 一致
+    _PARAM_KEYWORDS_LOWER = tuple(
+        (category, kw, kw.lower())
+        for category, keywords in PARAM_KEYWORDS.items()
+        for kw in keywords
+    )
     
     # 表格类型特征
     TABLE_TYPE_FEATURES = {
@@ -157,87 +188,158 @@ class VisualStructureAnalyzer:
             'indicators': ['协议', '标准']
         },
     }
+    # 打分用的 (类型, 关键词, 表头关键词)，顺序与 TABLE_TYPE_FEATURES 一致
+    _TABLE_TYPE_SCORING = tuple(
+        (table_type, tuple(features['keywords']), tuple(features['headers']))
+        for table_type, features in TABLE_TYPE_FEATURES.items()
+    )
+    # 各类型共用的关键词去重后只在文本中查找一次
+    _TABLE_KEYWORDS = tuple(dict.fromkeys(kw for _, keywords, _ in _TABLE_TYPE_SCORING for kw in keywords))
+    _TABLE_HEADER_KEYWORDS = tuple(dict.fromkeys(h for _, _, headers in _TABLE_TYPE_SCORING for h in headers))
+    
+    # 作为视觉区块提取的标签
+    BLOCK_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                  'section', 'div', 'table', 'ul', 'ol',
+                  'p', 'span', 'strong', 'b')
     
     def __init__(self):
-        self.soup: Optional[BeautifulSoup] = None
+        self.tree = None  # lxml解析后的页面
+        self._block_elements: List = []
+        self._block_depths: List[int] = []  # 与 _block_elements 一一对应的DOM深度
+        self._table_elements: List = []
+        self._table_text_lengths: Dict = {}  # 表格元素 -> 提取区块时得到的去空白文本长度
         self.url: str = ""
         self.blocks: List[VisualBlock] = []
         self.regions: List[ContentRegion] = []
         self.tables: List[TableStructure] = []
         self.patterns: List[SemanticPattern] = []
         
-    def analyze(self, html: str, url: str = "") -> Dict:
-        """执行完整的视觉结构分析"""
-        self.url = url
-        self.soup = BeautifulSoup(html, 'lxml')
+    def analyze(self, html: str, url: str = "", *, blocks: bool = True,
+                tables: bool = True, patterns: bool = True) -> Dict:
+        """执行视觉结构分析
         
-        # 1. 提取所有视觉区块
-        self._extract_visual_blocks()
+        blocks/tables/patterns 为 False 时跳过对应阶段，报告中相应部分为空；
+        内容区域和语义模式都基于视觉区块，关闭 blocks 时也一并为空。
+        """
+        self.url = url
+        self.tree = parse_document(html)
+        self._collect_elements()
         
-        # 2. 识别内容区域
-        self._identify_content_regions()
+        # 1. 提取所有视觉区块（同一遍历中识别内容区域）
+        if blocks:
+            self._extract_visual_blocks()
+        else:
+            self.blocks = []
+            self.regions = []
+            self._table_text_lengths = {}
         
-        # 3. 深度分析表格
-        self._analyze_tables()
+        # 2. 深度分析表格
+        if tables:
+            self._analyze_tables()
+        else:
+            self.tables = []
         
-        # 4. 发现语义模式
-        self._discover_semantic_patterns()
+        # 3. 发现语义模式
+        if patterns:
+            self._discover_semantic_patterns()
+        else:
+            self.patterns = []
         
-        # 5. 生成综合分析报告
+        # 4. 生成综合分析报告
         return self._generate_report()
     
+    @classmethod
+    def analyze_many(cls, pages: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """
+        批量分析 (html, url) 页面，所有页面共用同一个分析器实例
+        
+        lxml.html 的解析器本身就是模块级共享的，这里省去的是每页新建分析器；
+        每页的区块、区域、表格和模式都会重新生成，互不影响。
+        """
+        analyzer = cls()
+        return [analyzer.analyze(html, url) for html, url in pages]
+    
+    def _collect_elements(self):
+        """一次遍历DOM（标签过滤在libxml2中完成），按文档顺序收集区块元素、深度和表格元素"""
+        self._block_elements = blocks = []
+        self._block_depths = depths = []
+        self._table_elements = tables = []
+        if self.tree is None:
+            return
+        # 文档顺序保证祖先区块先于后代出现：向上只需走到最近的已知区块祖先
+        known = {}
+        for elem in self.tree.iter(*self.BLOCK_TAGS):
+            steps = 0
+            parent = elem.getparent()
+            while parent is not None:
+                parent_depth = known.get(parent)
+                if parent_depth is not None:
+                    steps += parent_depth
+                    break
+                steps += 1
+                parent = parent.getparent()
+            # 与BeautifulSoup一致，文档根对象也算一层
+            depth = steps + 1
+            known[elem] = depth
+            blocks.append(elem)
+            depths.append(depth)
+            if elem.tag == 'table':
+                tables.append(elem)
+    
     def _extract_visual_blocks(self):
-        """提取页面中的所有视觉区块"""
+        """提取页面中的所有视觉区块，并在同一遍历中按标题划分内容区域"""
         self.blocks = []
+        self.regions = []
+        self._table_text_lengths = {}
+        current_region = None
         
         # 遍历所有元素
-        for idx, elem in enumerate(self.soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 
-                                                        'section', 'div', 'table', 'ul', 'ol', 
-                                                        'p', 'span', 'strong', 'b'])):
-            if not elem.get_text(strip=True):
+        for idx, (elem, depth) in enumerate(zip(self._block_elements, self._block_depths)):
+            # 提取文本内容（每个元素只拼接一次）
+            text = element_text(elem)
+            if not text:
                 continue
             
-            # 计算DOM深度
-            depth = len(list(elem.parents))
-            
             # 提取CSS类
             css_classes = elem.get('class', [])
             if isinstance(css_classes, str):
                 css_classes = css_classes.split()
             
-            # 提取文本内容
-            text = elem.get_text(strip=True)
-            
             # 检测是否为标题
-            is_heading = elem.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
-            heading_level = int(elem.name[1]) if is_heading else 0
+            is_heading = elem.tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+            heading_level = int(elem.tag[1]) if is_heading else 0
             
             # 检测内容类型
-            is_table = elem.name == 'table'
-            is_list = elem.name in ['ul', 'ol']
+            is_table = elem.tag == 'table'
+            is_list = elem.tag in ['ul', 'ol']
+            if is_table:
+                self._table_text_lengths[elem] = len(text)
             
             # 统计内容
             char_count = len(text)
             word_count = len(text.split())
-            numbers = re.findall(r'\d+', text)
+            numbers = _NUMBER_RE.findall(text)
             number_count = len(numbers)
             
             # 检测型号提及
+            # 各模式的匹配可能互相重叠，findall 仍逐个模式执行；
+            # 所有型号模式都要求数字，不含数字的区块无需扫描，
+            # 其余先用合并正则扫描一次，绝大多数不含型号的区块可直接跳过
             model_mentions = []
-            for pattern in self.MODEL_PATTERNS:
-                matches = re.findall(pattern, text)
-                model_mentions.extend(matches)
+            if number_count and self._MODEL_UNION.search(text):
+                for pattern in self._MODEL_RES:
+                    model_mentions.extend(pattern.findall(text))
             
             # 检测参数提及
-            param_mentions = []
-            for category, keywords in self.PARAM_KEYWORDS.items():
-                for kw in keywords:
-                    if kw.lower() in text.lower():
-                        param_mentions.append((category, kw))
+            text_lower = text.lower()
+            param_mentions = [
+                (category, kw) for category, kw, kw_lower in self._PARAM_KEYWORDS_LOWER
+                if kw_lower in text_lower
+            ]
             
             block = VisualBlock(
                 block_type=self._classify_block_type(elem, text),
-                tag_name=elem.name,
+                tag_name=elem.tag,
                 css_classes=css_classes,
                 text_content=text[:200],  # 限制长度
                 element_id=elem.get('id'),
@@ -255,68 +357,64 @@ class VisualStructureAnalyzer:
             )
             
             self.blocks.append(block)
+            current_region = self._add_block_to_region(block, current_region)
+        
+        # 保存最后一个区域
+        if current_region:
+            self.regions.append(current_region)
     
-    def _classify_block_type(self, elem: Tag, text: str) -> str:
+    def _classify_block_type(self, elem, text: str) -> str:
         """分类区块类型"""
-        if elem.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+        if elem.tag in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
             return 'header'
-        elif elem.name == 'table':
+        elif elem.tag == 'table':
             return 'table'
-        elif elem.name in ['ul', 'ol']:
+        elif elem.tag in ['ul', 'ol']:
             return 'list'
-        elif elem.name == 'section':
+        elif elem.tag == 'section':
             return 'section'
         elif len(text) < 100:
             return 'text'
         else:
             return 'content'
     
-    def _identify_content_regions(self):
-        """识别内容区域"""
-        self.regions = []
-        current_region = None
-        region_counter = 0
-        
-        for block in self.blocks:
-            # 如果是标题，可能是新区域的开始
-            if block.is_heading:
-                # 保存当前区域
-                if current_region:
-                    self.regions.append(current_region)
-                
-                # 创建新区域
-                region_counter += 1
-                region_type = self._classify_region_type(block)
-                
-                current_region = ContentRegion(
-                    region_id=f"region_{region_counter}",
-                    region_type=region_type,
-                    title=block.text_content,
-                    heading_element=None,  # 简化处理
-                    start_depth=block.depth,
-                    end_depth=block.depth,
-                    blocks=[block],
-                    model_names=set(block.model_mentions),
-                    param_keywords=set(p[1] for p in block.param_mentions)
-                )
-            else:
-                # 添加到当前区域
-                if current_region:
-                    current_region.blocks.append(block)
-                    current_region.end_depth = max(current_region.end_depth, block.depth)
-                    current_region.model_names.update(block.model_mentions)
-                    current_region.param_keywords.update(p[1] for p in block.param_mentions)
-                    
-                    if block.is_table:
-                        current_region.table_count += 1
-                    elif block.is_list:
-                        current_region.list_count += 1
-                    else:
-                        current_region.text_block_count += 1
+    def _add_block_to_region(self, block: VisualBlock,
+                             current_region: Optional[ContentRegion]) -> Optional[ContentRegion]:
+        """把区块归入内容区域，返回新的当前区域"""
+        # 如果是标题，可能是新区域的开始
+        if block.is_heading:
+            # 保存当前区域
+            if current_region:
+                self.regions.append(current_region)
+            
+            # 创建新区域（编号 = 已保存区域数 + 1）
+            return ContentRegion(
+                region_id=f"region_{len(self.regions) + 1}",
+                region_type=self._classify_region_type(block),
+                title=block.text_content,
+                heading_element=None,  # 简化处理
+                start_depth=block.depth,
+                end_depth=block.depth,
+                blocks=[block],
+                model_names=set(block.model_mentions),
+                param_keywords=set(p[1] for p in block.param_mentions)
+            )
         
-        # 保存最后一个区域
+        # 添加到当前区域
         if current_region:
-            self.regions.append(current_region)
+            current_region.blocks.append(block)
+            current_region.end_depth = max(current_region.end_depth, block.depth)
+            current_region.model_names.update(block.model_mentions)
+            current_region.param_keywords.update(p[1] for p in block.param_mentions)
+            
+            if block.is_table:
+                current_region.table_count += 1
+            elif block.is_list:
+                current_region.list_count += 1
+            else:
+                current_region.text_block_count += 1
+        
+        return current_region
     
     def _classify_region_type(self, block: VisualBlock) -> str:
         """分类区域类型"""
@@ -340,63 +438,81 @@ class VisualStructureAnalyzer:
     
     def _analyze_tables(self):
         """深度分析所有表格"""
-        tables = self.soup.find_all('table')
-        
-        for idx, table in enumerate(tables):
+        self.tables = []  # 同一实例分析多个页面时不累积上一页的表格
+        for idx, table in enumerate(self._table_elements):
             structure = self._analyze_single_table(table, idx)
             if structure:
                 self.tables.append(structure)
     
-    def _analyze_single_table(self, table: Tag, index: int) -> Optional[TableStructure]:
+    def _analyze_single_table(self, table, index: int) -> Optional[TableStructure]:
         """分析单个表格"""
-        text = table.get_text(strip=True)
-        if len(text) < 200:
+        # 去除空白的文本长度在提取区块时已得到，直接复用；
+        # 否则只拼接到满 200 字符为止，小表格无需拼接完整文本
+        text_length = self._table_text_lengths.get(table)
+        if text_length is None:
+            text_length = len(element_text_prefix(table, 200))
+        if text_length < 200:
             return None
         
+        # 一次遍历表格后代元素：首个thead、所有行、合并单元格标记
+        header_row = None
+        all_rows = []
+        has_rowspan = has_colspan = False
+        for node in table.iterdescendants(etree.Element):
+            if node.tag == 'tr':
+                all_rows.append(node)
+            elif node.tag == 'thead' and header_row is None:
+                header_row = node
+            attrib = node.attrib
+            if 'rowspan' in attrib:
+                has_rowspan = True
+            if 'colspan' in attrib:
+                has_colspan = True
+        
         # 提取表头
         headers = []
-        header_row = table.find('thead')
-        if header_row:
-            headers = [th.get_text(strip=True) for th in header_row.find_all(['th', 'td'])]
-        else:
-            first_row = table.find('tr')
-            if first_row:
-                headers = [cell.get_text(strip=True) for cell in first_row.find_all(['th', 'td'])]
+        if header_row is not None:
+            headers = [element_text(th) for th in header_row.iter('th', 'td')]
+        elif all_rows:
+            headers = [element_text(cell) for cell in all_rows[0].iter('th', 'td')]
         
         col_count = len(headers)
         
         # 统计行数
-        rows = table.find_all('tr')[1:] if headers else table.find_all('tr')
+        rows = all_rows[1:] if headers else all_rows
         row_count = len(rows)
         
-        # 检测合并单元格
-        has_rowspan = bool(table.find(attrs={'rowspan': True}))
-        has_colspan = bool(table.find(attrs={'colspan': True}))
+        # 前10行的单元格只收集一次，供第一列分析、样本数据和映射建议共用；
+        # 这些用途最多取每行前5个单元格
+        row_cells = [list(islice(row.iter('td', 'th'), 5)) for row in rows[:10]]
+        first_cells = [element_text(cells[0]) for cells in row_cells if cells]
         
         # 分析第一列类型
-        first_col_type = self._analyze_first_column(rows, headers)
+        first_col_type = self._analyze_first_column(first_cells) if rows else 'unknown'
         
         # 分析数据方向
         data_orientation = self._analyze_data_orientation(rows, headers)
         
         # 检测内容特征
-        full_text = table.get_text().lower()
-        contains_models = any(re.search(p, full_text) for p in self.MODEL_PATTERNS)
-        contains_numbers = bool(re.search(r'\d+\s*(gbps|mhz|w|v)', full_text))
-        contains_ports = any(kw in full_text for kw in ['port', 'sfp', 'ethernet', 'base-t'])
-        contains_performance = any(kw in full_text for kw in ['capacity', 'forwarding', 'entries'])
+        # 原样文本交给libxml2序列化（与逐段拼接 itertext 相同）；
+        # 型号模式区分大小写，必须在原文上匹配，其余关键词检查使用小写文本
+        full_text = etree.tostring(table, method='text', encoding='unicode', with_tail=False)
+        contains_models = self._MODEL_UNION.search(full_text) is not None
+        text_lower = full_text.lower()
+        contains_numbers = bool(_TABLE_NUMBER_UNIT_RE.search(text_lower))
+        contains_ports = any(kw in text_lower for kw in ['port', 'sfp', 'ethernet', 'base-t'])
+        contains_performance = any(kw in text_lower for kw in ['capacity', 'forwarding', 'entries'])
         
         # 获取样本数据
         sample_cells = []
-        for row in rows[:3]:
-            cells = row.find_all(['td', 'th'])
-            sample_cells.append([cell.get_text(strip=True)[:50] for cell in cells[:5]])
+        for cells in row_cells[:3]:
+            sample_cells.append([element_text(cell)[:50] for cell in cells])
         
         # 检测表格类型
-        table_type, confidence = self._detect_table_type(table, headers, full_text)
+        table_type, confidence = self._detect_table_type(table, headers, text_lower)
         
         # 生成映射建议
-        suggested_mappings = self._suggest_param_mappings(rows, headers)
+        suggested_mappings = self._suggest_param_mappings(first_cells, headers)
         
         return TableStructure(
             table_index=index,
@@ -419,19 +535,10 @@ class VisualStructureAnalyzer:
             suggested_mappings=suggested_mappings
         )
     
-    def _analyze_first_column(self, rows, headers) -> str:
-        """分析第一列类型"""
-        if not rows:
-            return 'unknown'
-        
-        first_cells = []
-        for row in rows[:10]:
-            cells = row.find_all(['td', 'th'])
-            if cells:
-                first_cells.append(cells[0].get_text(strip=True))
-        
+    def _analyze_first_column(self, first_cells: List[str]) -> str:
+        """分析第一列类型（first_cells 为前10行首个单元格的文本）"""
         # 检查是否为型号
-        model_count = sum(1 for cell in first_cells if any(re.search(p, cell) for p in self.MODEL_PATTERNS))
+        model_count = sum(1 for cell in first_cells if self._MODEL_UNION.search(cell))
         if model_count > len(first_cells) * 0.5:
             return 'model'
         
@@ -440,7 +547,8 @@ class VisualStructureAnalyzer:
             return 'feature'
         
         # 检查是否为序号
-        if all(re.match(r'^\d+$', cell) for cell in first_cells[:5]):
+        # isdecimal 与正则 \d+ 一样只接受十进制数字（isdigit 还会接受上标等字符）
+        if all(cell.isdecimal() for cell in first_cells[:5]):
             return 'index'
         
         return 'category'
@@ -453,30 +561,24 @@ class VisualStructureAnalyzer:
         # 如果第一列看起来是特征名，数据是横向的
         return 'row-wise'
     
-    def _detect_table_type(self, table: Tag, headers: List[str], text: str) -> Tuple[str, float]:
-        """检测表格类型"""
-        text_lower = text.lower()
+    def _detect_table_type(self, table, headers: List[str], text_lower: str) -> Tuple[str, float]:
+        """检测表格类型（text_lower 需已转为小写）"""
         header_str = ' '.join(h.lower() for h in headers)
         
-        scores = {}
-        for table_type, features in self.TABLE_TYPE_FEATURES.items():
-            score = 0
-            
-            # 关键词匹配
-            for kw in features['keywords']:
-                if kw in text_lower:
-                    score += 2
-            
-            # 表头匹配
-            for h in features['headers']:
-                if h in header_str:
-                    score += 3
-            
-            scores[table_type] = score
+        # 每个不同的关键词只做一次子串查找，各类型再按命中集合计分
+        text_hits = {kw for kw in self._TABLE_KEYWORDS if kw in text_lower}
+        header_hits = {h for h in self._TABLE_HEADER_KEYWORDS if h in header_str}
         
-        if scores:
-            best_type = max(scores, key=scores.get)
-            best_score = scores[best_type]
+        # 单遍取最高分，同分时保留先出现的类型
+        best_type, best_score = None, -1
+        for table_type, keywords, header_keywords in self._TABLE_TYPE_SCORING:
+            # 关键词匹配 + 表头匹配
+            score = (2 * sum(kw in text_hits for kw in keywords)
+                     + 3 * sum(h in header_hits for h in header_keywords))
+            if score > best_score:
+                best_type, best_score = table_type, score
+        
+        if best_type is not None:
             confidence = min(best_score / 10, 1.0)
             return best_type, confidence
         
@@ -494,47 +596,35 @@ class VisualStructureAnalyzer:
         }
         return extractor_map.get(table_type, 'generic')
     
-    def _suggest_param_mappings(self, rows, headers) -> List[Dict]:
-        """建议参数映射"""
+    def _suggest_param_mappings(self, first_cells: List[str], headers) -> List[Dict]:
+        """建议参数映射（first_cells 为前10行首个单元格的文本）"""
         mappings = []
         
-        if not rows or not headers:
+        if not first_cells or not headers:
             return mappings
         
         # 分析第一列的特征名
-        for row in rows[:10]:
-            cells = row.find_all(['td', 'th'])
-            if cells:
-                feature_name = cells[0].get_text(strip=True)
-                if feature_name:
-                    # 尝试匹配已知参数
-                    suggested_mapping = self._match_param_pattern(feature_name)
-                    if suggested_mapping:
-                        mappings.append({
-                            'original': feature_name,
-                            'suggested': suggested_mapping,
-                            'confidence': 'high'
-                        })
+        for feature_name in first_cells:
+            if feature_name:
+                # 尝试匹配已知参数
+                suggested_mapping = self._match_param_pattern(feature_name)
+                if suggested_mapping:
+                    mappings.append({
+                        'original': feature_name,
+                        'suggested': suggested_mapping,
+                        'confidence': 'high'
+                    })
         
         return mappings
     
     def _match_param_pattern(self, param_name: str) -> Optional[str]:
         """匹配参数模式"""
         param_lower = param_name.lower()
+        if not _PARAM_MAPPINGS_ANY.search(param_lower):
+            return None
         
-        # 常见参数映射
-        mappings = {
-            r'port\s*switching\s*capacity': '交换容量',
-            r'forwarding\s*rate': '包转发率',
-            r'mac\s*address': 'MAC地址表',
-            r'vlan\s*table': 'VLAN表项',
-            r'dimension': '尺寸',
-            r'weight': '重量',
-            r'power\s*supply': '电源槽位数',
-        }
-        
-        for pattern, chinese in mappings.items():
-            if re.search(pattern, param_lower):
+        for pattern, chinese in _PARAM_MAPPINGS:
+            if pattern.search(param_lower):
                 return chinese
         
         return None
@@ -544,33 +634,29 @@ class VisualStructureAnalyzer:
         self.patterns = []
         
         # 1. 型号命名模式
-        all_models = set()
-        for block in self.blocks:
-            all_models.update(block.model_mentions)
+        all_models = {m for block in self.blocks for m in block.model_mentions}
         
         if all_models:
             self.patterns.append(SemanticPattern(
                 pattern_type='model_naming',
                 pattern=r'S\d{4}[A-Z]*-[\w-]+',
                 confidence=0.9,
-                examples=list(all_models)[:5],
+                examples=list(islice(all_models, 5)),
                 suggestion='检测到H3C型号命名模式'
             ))
         
         # 2. 参数格式模式
-        # 分析数值格式
-        value_patterns = defaultdict(int)
-        for block in self.blocks:
-            numbers = re.findall(r'(\d+)\s*(Gbps|MHz|W|V|GB)', block.text_content)
-            for num, unit in numbers:
-                value_patterns[f'{num}{unit}'] += 1
+        # 分析数值格式：所有区块文本拼接后一次扫描，
+        # 分隔符 \x00 既不是数字也不是空白，匹配不会跨越区块
+        all_text = '\x00'.join(block.text_content for block in self.blocks)
+        value_patterns = Counter(f'{num}{unit}' for num, unit in _VALUE_UNIT_RE.findall(all_text))
         
         if value_patterns:
             self.patterns.append(SemanticPattern(
                 pattern_type='value_format',
                 pattern=r'\d+\s*(Gbps|MHz|W|V|GB)',
                 confidence=0.85,
-                examples=list(value_patterns.keys())[:5],
+                examples=list(islice(value_patterns, 5)),
                 suggestion='检测到标准数值单位格式'
             ))
     
@@ -590,8 +676,8 @@ class VisualStructureAnalyzer:
                     'title': r.title,
                     'block_count': len(r.blocks),
                     'table_count': r.table_count,
-                    'model_names': list(r.model_names)[:10],
-                    'param_keywords': list(r.param_keywords)[:10]
+                    'model_names': list(islice(r.model_names, 10)),
+                    'param_keywords': list(islice(r.param_keywords, 10))
                 }
                 for r in self.regions
             ],
@@ -2,11 +2,144 @@
 """
 Direct LLM table processing - uses current agent's capabilities
 """
+import hashlib
 import json
+import os
 import re
-from typing import Dict, List, Optional, Tuple
-from bs4 import BeautifulSoup, Tag
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+from lxml import etree
 
+try:
+    from .html_utils import TABLE_OPEN_RE, element_text, has_text_length, parse_document
+except ImportError:  # imported as a top-level module with scripts/ on sys.path
+    from html_utils import TABLE_OPEN_RE, element_text, has_text_length, parse_document
+
+
+_MISSING = object()
+
+# Regex patterns compiled once at import instead of on every call
+
+# Model-like column header (starts with S, has numbers)
+_MODEL_COLUMN_RE = re.compile(r'S\d+[\w\-]+')
+
+# Parameter name -> Chinese name, tried in order against the lowercased name
+_PARAM_NAME_MAPPINGS = tuple((re.compile(pattern), chinese) for pattern, chinese in (
+    (r'power\s*consumption|功耗|功率', '功耗'),
+    (r'input\s*voltage|额定电压|输入电压', '输入电压'),
+    (r'switching\s*capacity|交换容量', '交换容量'),
+    (r'forwarding\s*(rate|capacity)|包转发率|转发容量', '包转发率'),
+    (r'mac\s*address|mac地址|mac表', 'MAC地址表'),
+    (r'dimension|尺寸|外形尺寸', '尺寸'),
+    (r'weight|重量', '重量'),
+    (r'temperature|工作温度', '工作温度'),
+    (r'humidity|工作湿度|湿度', '工作湿度'),
+    (r'mtbf|平均无故障', 'MTBF'),
+    (r'mttr|平均修复', 'MTTR'),
+    (r'power\s*supply\s*slots?|电源槽位|电源数量|电源槽', '电源槽位数'),
+    (r'fan\s*(num|number|quantity)|风扇槽位|风扇数量|风扇槽|fan num', '风扇数量'),
+    (r'console|console口|串口|console port', 'Console口'),
+    (r'usb|usb口|usb port', 'USB口'),
+    (r'management|管理口|网管口|management port', '管理网口'),
+    (r'flash|flash内存', 'Flash'),
+    (r'sdram|内存|sdram', 'SDRAM'),
+    (r'cpu|处理器', 'CPU'),
+    (r'latency|时延|延迟|latency', '延迟'),
+    (r'packet\s*buffer|包缓存|报文缓存', '包缓存'),
+    (r'jumbo\s*frame|巨帧', '巨帧'),
+    (r'buffer|缓存|缓冲区', '缓存'),
+    (r'base-t\s*port|电口|以太网口', '电口数量'),
+    (r'sfp\+\s*port|sfp\+\s*光口', 'SFP+端口数'),
+    (r'sfp(?!\+)\s*port|sfp(?!\+)\s*光口', 'SFP端口数'),
+    (r'sfp28\s*port|sfp28\s*光口', 'SFP28端口数'),
+    (r'qsfp\+\s*port|qsfp\+\s*光口', 'QSFP+端口数'),
+    (r'qsfp(?!\+)\s*port|qsfp(?!\+)\s*光口', 'QSFP端口数'),
+    (r'qsfp28\s*port|qsfp28\s*光口', 'QSFP28端口数'),
+    (r'multigiga|multi-giga|2\.5g|5g|多速率', 'MultiGiga端口数'),
+    (r'maximum\s*stacking\s*bandwidth|堆叠带宽|最大堆叠带宽', '最大堆叠带宽'),
+    (r'maximum\s*stacking\s*num|堆叠数量|最大堆叠数', '最大堆叠数'),
+))
+
+# Port description parsing
+# (port keywords as one pattern so a name is scanned once; 'qsfp' is covered by 'sfp')
+_PORT_KEYWORDS_RE = re.compile('|'.join(re.escape(kw) for kw in (
+    'sfp', 'base-t', 'ethernet', 'port', '光口', '电口', 'multigiga', 'multi-giga',
+)))
+_PORT_COUNT_RE = re.compile(r'(\d+)\s*(?:\([^)]*\))?')
+_COMBO_PORTS_RE = re.compile(r'\((\d+)\s*\*?\s*(?:base-t\s*)?combo\)')
+_SPEED_PORT_PATTERNS = tuple((re.compile(pattern), port_type) for pattern, port_type in (
+    (r'(\d+)\s*[\*x×]?\s*2\.5g', '2.5G端口数'),
+    (r'(\d+)\s*[\*x×]?\s*5g', '5G端口数'),
+    (r'(\d+)\s*[\*x×]?\s*10g', '10G端口数'),
+))
+# Whether any of the speed patterns above can match; most descriptions have no such port
+_SPEED_PORTS_ANY_RE = re.compile(r'\d\s*[\*x×]?\s*(?:2\.5|5|10)g')
+
+# POE port quantities: (field, patterns tried in order)
+# Pattern: 15.4W (802.3af): 8 or 15.4W: 8 (802.3af)
+_POE_PORT_PATTERNS = tuple((field, tuple(map(re.compile, patterns))) for field, patterns in (
+    ('POE端口数(802.3af)', (
+        r'15\.4W\s*\(802\.3af\)[:\s]+(\d+)(?!\d)',  # 15.4W (802.3af): 8
+        r'15\.4W[:\s]+(\d+)\s*\(802\.3af\)',       # 15.4W: 8 (802.3af)
+    )),
+    ('POE+端口数(802.3at)', (
+        r'30W\s*\(802\.3at\)[:\s]+(\d+)(?!\d)',     # 30W (802.3at): 4
+        r'30W[:\s]+(\d+)\s*\(802\.3at\)',          # 30W: 4 (802.3at)
+    )),
+    ('POE++端口数(60W)', (
+        r'60W\s*\(802\.3bt\)[:\s]+(\d+)(?!\d)',    # 60W (802.3bt): X
+        r'60W[:\s]+(\d+)\s*\(802\.3bt\)',          # 60W: X (802.3bt)
+    )),
+    ('POE++端口数(90W)', (
+        r'90W\s*\(802\.3bt\)[:\s]+(\d+)(?!\d)',    # 90W (802.3bt): X
+        r'90W[:\s]+(\d+)\s*\(802\.3bt\)',          # 90W: X (802.3bt)
+    )),
+))
+
+# Model descriptions, e.g.
+# S5570S-28S-EI: 24 x 10/100/1000BASE-T Ethernet ports, 4 x 1G/10G BASE-X SFP+ ports
+# S5130S-28P-EI: 24 x 10/100/1000BASE-T Ports and 4 x 1000BASE-X SFP Ports
+_MODEL_DESCRIPTION_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(S\d{4}[A-Z]*-[\w-]+):\s*([0-9x\s/]+(?:BASE-T|Ethernet|Ports|SFP)[^\n;]+?)(?=\n|S\d{4}|$)',
+    r'(S\d{4}[A-Z]*-[\w-]+)\s*[:：]\s*([^\n]+?)(?=\n|S\d{4}|$)',
+))
+_MODEL_NAME_RE = re.compile(r'(S\d{4}[A-Z]*-[\w-]+)')
+_LEADING_SEPARATORS_RE = re.compile(r'^[\s:：]+')
+
+# Model name prefixes whose models receive series-level table data
+_SERIES_MODEL_PREFIXES = ('S5130', 'S5590', 'S6520', 'S5560', 'S125', 'S105', 'S76', 'S75')
+# Longest series prefix of a model; an anchored alternation takes the first
+# alternative that matches, so prefixes are tried longest first whatever the
+# order they are listed in (e.g. S5130S-EI before S5130S before S5130)
+_SERIES_PREFIXES = ('S5130S-EI', 'S5130S', 'S5130', 'S5590', 'S6520', 'S5560', 'S125', 'S105', 'S76', 'S75')
+_SERIES_PREFIX_RE = re.compile('|'.join(
+    re.escape(prefix) for prefix in sorted(_SERIES_PREFIXES, key=len, reverse=True)
+))
+
+# Table type keywords tried by _detect_table_type in priority order (matched against lowercased text)
+_STANDARD_BODY_KEYWORDS = ('ieee', 'rfc', 'standard')
+_POE_TABLE_KEYWORDS = ('poe power capacity', 'total poe power', '802.3af', '802.3at')
+_SOFTWARE_TABLE_KEYWORDS = ('vlan', 'routing protocol', 'security feature', 'layer 2', 'layer 3')
+_PROTOCOL_TABLE_KEYWORDS = ('ieee', 'rfc', 'standard', 'compliance')
+_PERFORMANCE_TABLE_KEYWORDS = ('mac address', 'forwarding rate', 'routing table')
+
+# h2/h3 titles that are not series features: table-related headers, generic page
+# sections, "Hardware Specifications (continued)" and common navigation/footer terms
+_FEATURE_HEADER_SKIP_RE = re.compile('|'.join(re.escape(term) for term in (
+    'hardware', 'specification', 'performance', 'poe', 'removable',
+    'components', 'matrix', 'standards', 'protocols', 'resource',
+    'related', 'cloud', 'ai', 'intelligent', 'security', 'smb',
+    'terminal', 'industry', 'solution', 'service', 'policy',
+    'online', 'training', 'partner', 'profile', 'news', 'contact',
+    'blog', 'learning', 'certification', 'exhibition',
+    '规格', '性能', '硬件', '软件', '协议', '标准', '资源',
+    '博客', '培训', '认证', '展览', '联系',
+    'continued',
+    'global', 'help', 'become', 'business',
+)))
 
 class DirectTableExtractor:
     """
@@ -14,6 +147,15 @@ class DirectTableExtractor:
     In OpenClaw, the agent (me) processes these directly.
     """
     
+    # Chassis switches typically have these model prefixes
+    _CHASSIS_PREFIXES = ('S125', 'S105', 'S76', 'S75', 'S95', 'S98')
+    # Chassis-specific parameters (matched against lowercased parameter names)
+    _CHASSIS_PARAMS = ('业务板槽位', '主控板槽位', '接口板槽位', '槽位数', 'chassis', 'slot')
+    # Upper bound on models collected from a page's free text
+    MAX_DESCRIBED_MODELS = 200
+    # Processed tables kept per extractor, keyed by a digest of the table markup
+    TABLE_CACHE_SIZE = 256
+    
     def __init__(self):
         self.results = {}
         # Parameters to skip (removable components, board support, etc.)
@@ -22,6 +164,18 @@ class DirectTableExtractor:
             r'board support', r'card support', r'是否支持',
             r'电源模块型号', r'可移除'
         ]
+        # skip_patterns compiled into one alternation; rebuilt when the list changes
+        self._skip_source: Optional[List[str]] = None
+        self._skip_re = None
+        # Extractors for the table types that have a dedicated layout
+        self._table_extractors = {
+            'poe': self._extract_poe_table,
+            'software': self._extract_software_table,
+            'performance': self._extract_performance_table,
+            'protocols': self._extract_protocols_table,
+        }
+        # Identical tables recur across a series' pages, so results are reused (LRU)
+        self._table_cache: 'OrderedDict[bytes, Optional[Dict[str, Dict]]]' = OrderedDict()
     
     def extract_all_tables(self, html_content: str, page_url: str = "") -> Dict[str, Dict]:
         """
@@ -29,18 +183,16 @@ class DirectTableExtractor:
         
         Returns dict of {model_name: {param: value}}
         """
-        soup = BeautifulSoup(html_content, 'lxml')
-        tables = soup.find_all('table')
+        if not html_content or not TABLE_OPEN_RE.search(html_content):
+            return {}
+        doc = parse_document(html_content)
+        if doc is None:
+            return {}
+        tables = list(doc.iter('table'))
         
         all_data = {}
         series_data = {}  # Store series-level info (software, protocols, etc.)
         
-        # Extract series features (applies to all models in series)
-        series_features = self._extract_series_features(soup, page_url)
-        
-        # Extract model descriptions from page
-        model_descriptions = self._extract_model_descriptions(soup)
-        
         for i, table in enumerate(tables):
             table_data = self._process_table(table, i, page_url)
             if table_data:
@@ -56,6 +208,14 @@ class DirectTableExtractor:
                             all_data[model_name] = {}
                         all_data[model_name].update(specs)
         
+        # Page-level text is only needed once some table produced model data
+        if all_data:
+            # Extract series features (applies to all models in series)
+            series_features = self._extract_series_features(doc, page_url)
+            
+            # Extract model descriptions from page
+            model_descriptions = self._extract_model_descriptions(doc, all_data)
+        
         # Add URL, descriptions, and series features to all models
         for model_name in all_data:
             # Add page URL
@@ -73,55 +233,44 @@ class DirectTableExtractor:
         # Find common series prefix
         if series_data and all_data:
             # Try to identify series from model names
-            series_keys = list(series_data.keys())
-            model_keys = [k for k in all_data.keys() if k.startswith(('S5130', 'S5590', 'S6520', 'S5560', 'S125', 'S105', 'S76', 'S75'))]
+            model_keys = [k for k in all_data.keys() if k.startswith(_SERIES_MODEL_PREFIXES)]
             
             if model_keys:
                 # Extract series prefix (e.g., "S5130" from "S5130S-28P-EI")
                 first_model = model_keys[0]
-                series_prefix = ''
-                for prefix in ['S5130S-EI', 'S5130S', 'S5130', 'S5590', 'S6520', 'S5560', 'S125', 'S105', 'S76', 'S75']:
-                    if first_model.startswith(prefix):
-                        series_prefix = prefix
-                        break
+                prefix_match = _SERIES_PREFIX_RE.match(first_model)
+                series_prefix = prefix_match.group() if prefix_match else ''
                 
-                # Merge matching series data
+                # Every matching series entry applies to all models, so the entries are
+                # merged in page order first and each model is updated only once
+                merged_specs = {}
                 for series_key, series_specs in series_data.items():
-                    if series_prefix and series_prefix in series_key:
-                        for model_name in model_keys:
-                            all_data[model_name].update(series_specs)
-                    elif 'Protocols' in series_key:
-                        # Protocols apply to all models
-                        for model_name in model_keys:
-                            all_data[model_name].update(series_specs)
-                    elif 'Performance' in series_key:
-                        # Performance data applies to all models in the series
-                        for model_name in model_keys:
-                            all_data[model_name].update(series_specs)
+                    # Entries for this series, protocols (apply to all models) and
+                    # performance data (applies to all models in the series)
+                    if ((series_prefix and series_prefix in series_key)
+                            or 'Protocols' in series_key or 'Performance' in series_key):
+                        merged_specs.update(series_specs)
+                if merged_specs:
+                    for model_name in model_keys:
+                        all_data[model_name].update(merged_specs)
         
         # Post-processing: normalize and merge fields
         for model_name, specs in all_data.items():
-            # Merge 1G端口数 into 1000Base-T端口数
-            if '1G端口数' in specs and '1000Base-T端口数' not in specs:
-                specs['1000Base-T端口数'] = specs['1G端口数']
-            # Remove the redundant 1G端口数 field after merging
-            if '1G端口数' in specs:
-                del specs['1G端口数']
+            # Merge 1G端口数 into 1000Base-T端口数 and remove the redundant field
+            ports_1g = specs.pop('1G端口数', _MISSING)
+            if ports_1g is not _MISSING:
+                specs.setdefault('1000Base-T端口数', ports_1g)
             
-            # Merge POE总功率_AC/DC into POE总功率
+            # Merge POE总功率_AC/DC into POE总功率 and remove the redundant fields
+            poe_ac = specs.pop('POE总功率_AC', _MISSING)
+            poe_dc = specs.pop('POE总功率_DC', _MISSING)
             poe_power_parts = []
-            if 'POE总功率_AC' in specs:
-                poe_power_parts.append(f"AC:{specs['POE总功率_AC']}W")
-            if 'POE总功率_DC' in specs:
-                poe_power_parts.append(f"DC:{specs['POE总功率_DC']}W")
-            if poe_power_parts and 'POE总功率' not in specs:
-                specs['POE总功率'] = '/'.join(poe_power_parts)
-            
-            # Remove redundant POE power fields after merging
-            if 'POE总功率_AC' in specs:
-                del specs['POE总功率_AC']
-            if 'POE总功率_DC' in specs:
-                del specs['POE总功率_DC']
+            if poe_ac is not _MISSING:
+                poe_power_parts.append(f"AC:{poe_ac}W")
+            if poe_dc is not _MISSING:
+                poe_power_parts.append(f"DC:{poe_dc}W")
+            if poe_power_parts:
+                specs.setdefault('POE总功率', '/'.join(poe_power_parts))
             
             # Classify as box switch or chassis switch
             specs['交换机类型'] = self._classify_switch_type(model_name, specs)
@@ -130,34 +279,47 @@ class DirectTableExtractor:
     
     def _classify_switch_type(self, model_name: str, specs: Dict) -> str:
         """Classify switch as box (fixed) or chassis (modular) type."""
-        # Chassis switches typically have these model prefixes
-        chassis_prefixes = ['S125', 'S105', 'S76', 'S75', 'S95', 'S98']
-        
         # Check model name prefix
-        for prefix in chassis_prefixes:
-            if model_name.startswith(prefix):
-                return '框式交换机'
+        if model_name.startswith(self._CHASSIS_PREFIXES):
+            return '框式交换机'
         
-        # Check for chassis-specific parameters
-        chassis_params = ['业务板槽位', '主控板槽位', '接口板槽位', '槽位数', 'chassis', 'slot']
-        for param in specs:
-            param_lower = param.lower()
-            if any(cp in param_lower for cp in chassis_params):
-                return '框式交换机'
+        # Check for chassis-specific parameters; the joined names are searched once
+        # (the separator cannot occur inside any of the keywords)
+        param_names = '\x01'.join(specs).lower()
+        if any(cp in param_names for cp in self._CHASSIS_PARAMS):
+            return '框式交换机'
         
         # Default to box switch
         return '盒式交换机'
     
-    def _process_table(self, table: Tag, index: int, page_url: str) -> Optional[Dict[str, Dict]]:
-        """Process a single table."""
-        # Get table text for classification
-        text = table.get_text(strip=True)
-        
-        # Skip small/nav tables
-        if len(text) < 200:
+    def _process_table(self, table: etree._Element, index: int, page_url: str) -> Optional[Dict[str, Dict]]:
+        """Process a single table, reusing the result for a table already seen."""
+        # Skip small/nav tables (counted without building their text)
+        if not has_text_length(table, 200):
             return None
         
-        # Detect table type
+        # Cached tables were processed with the skip patterns in effect at the time
+        if self.skip_patterns != self._skip_source:
+            self._compile_skip_patterns()
+        key = hashlib.blake2b(etree.tostring(table, with_tail=False), digest_size=16).digest()
+        cache = self._table_cache
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = self._process_table_uncached(table)
+            cache[key] = result
+            if len(cache) > self.TABLE_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        if not result:
+            return result
+        # Callers keep and modify the per-model dicts, so each caller gets its own copies
+        return {model_name: dict(specs) for model_name, specs in result.items()}
+    
+    def _process_table_uncached(self, table: etree._Element) -> Optional[Dict[str, Dict]]:
+        """Classify and extract a table that passed the size check."""
+        # Detect table type from the full table text
+        text = element_text(table)
         table_type = self._detect_table_type(text)
         
         # Parse table structure
@@ -167,91 +329,93 @@ class DirectTableExtractor:
             return None
         
         # Handle based on table type
-        if table_type == 'poe':
-            return self._extract_poe_table(headers, rows)
-        elif table_type == 'software':
-            return self._extract_software_table(headers, rows)
-        elif table_type == 'performance':
-            return self._extract_performance_table(headers, rows)
-        elif table_type == 'protocols':
-            return self._extract_protocols_table(headers, rows)
+        extract = self._table_extractors.get(table_type)
+        if extract is not None:
+            return extract(headers, rows)
         
         # Check if this is a multi-model hardware table
-        if len(headers) > 2 and self._is_multi_model_table(headers):
-            return self._extract_multi_model_table(headers, rows)
-        else:
-            return self._extract_generic_table(headers, rows)
+        # (model columns are classified once and handed to the extractor)
+        if len(headers) > 2:
+            model_cols = self._model_columns(headers)
+            if model_cols or _MODEL_COLUMN_RE.search(headers[0]):
+                return self._extract_multi_model_table(headers, rows, model_cols)
+        return self._extract_generic_table(headers, rows)
     
-    def _detect_table_type(self, text: str) -> str:
+    @staticmethod
+    def _detect_table_type(text: str) -> str:
         """Detect table type from content."""
         text_lower = text.lower()
         
         # Check for protocols first (to avoid misclassification with POE keywords)
-        if 'organization' in text_lower and any(x in text_lower for x in ['ieee', 'rfc', 'standard']):
+        if 'organization' in text_lower and any(x in text_lower for x in _STANDARD_BODY_KEYWORDS):
             return 'protocols'
         elif 'standards and protocols' in text_lower:
             return 'protocols'
         # Check for actual POE power tables (not just model names with PWR)
-        elif any(x in text_lower for x in ['poe power capacity', 'total poe power', '802.3af', '802.3at']) and 'quantity' in text_lower:
+        elif any(x in text_lower for x in _POE_TABLE_KEYWORDS) and 'quantity' in text_lower:
             return 'poe'
-        elif any(x in text_lower for x in ['entries', 'mac address entries', 'vlan table', 'routing entries', 'arp entries']):
+        elif 'entries' in text_lower or 'vlan table' in text_lower:
             # Performance tables often have "Entries" in title and contain metrics
+            # (this covers "mac address entries", "routing entries" and "arp entries")
             return 'performance'
-        elif any(x in text_lower for x in ['vlan', 'routing protocol', 'security feature', 'layer 2', 'layer 3']):
+        elif any(x in text_lower for x in _SOFTWARE_TABLE_KEYWORDS):
             return 'software'
-        elif any(x in text_lower for x in ['ieee', 'rfc', 'standard', 'compliance']):
+        elif any(x in text_lower for x in _PROTOCOL_TABLE_KEYWORDS):
             return 'protocols'
-        elif any(x in text_lower for x in ['mac address', 'forwarding rate', 'routing table']):
+        elif any(x in text_lower for x in _PERFORMANCE_TABLE_KEYWORDS):
             return 'performance'
         else:
             return 'hardware'
     
-    def _parse_table_structure(self, table: Tag) -> Tuple[List[str], List[Dict]]:
+    def _parse_table_structure(self, table: etree._Element) -> Tuple[List[str], List[Dict]]:
         """Parse table into headers and rows."""
         # Find headers
-        thead = table.find('thead')
-        if thead:
-            header_row = thead.find('tr')
+        thead = table.find('.//thead')
+        if thead is not None:
+            header_row = thead.find('.//tr')
         else:
-            header_row = table.find('tr')
+            header_row = table.find('.//tr')
         
-        if not header_row:
+        if header_row is None:
             return [], []
         
-        headers = []
-        for th in header_row.find_all(['th', 'td']):
-            headers.append(th.get_text(strip=True))
+        headers = [element_text(th) for th in header_row.iter('th', 'td')]
         
         # Handle special tables with merged title row (e.g., "FeatureS5130S-EI Series Switches")
         # These tables actually have 2 columns: Feature | Description
         # Only apply to Feature/Entries tables, not to Organization/Protocols tables
         if len(headers) == 1:
             header_text = headers[0].lower()
-            if any(keyword in header_text for keyword in ['feature', 'entries']):
+            if 'feature' in header_text or 'entries' in header_text:
                 # This is a software or performance table with implicit 2 columns
                 headers = ['Feature', 'Description']
             # Note: Organization/Protocols tables keep their original structure
         
         # Find data rows
         rows = []
-        tbody = table.find('tbody')
-        if tbody:
-            data_rows = tbody.find_all('tr')
+        tbody = table.find('.//tbody')
+        if tbody is not None:
+            data_rows = tbody.iter('tr')
         else:
-            data_rows = table.find_all('tr')[1:]  # Skip header
+            data_rows = islice(table.iter('tr'), 1, None)  # Skip header
         
+        header_count = len(headers)
         for tr in data_rows:
             row_data = {}
-            cells = tr.find_all(['td', 'th'])
+            cells = tr.iter('td', 'th')
             
             for i, cell in enumerate(cells):
-                if i < len(headers):
-                    # Handle colspan by duplicating value
-                    colspan = int(cell.get('colspan', 1))
-                    value = cell.get_text(strip=True)
-                    for j in range(colspan):
-                        if i + j < len(headers):
-                            row_data[headers[i + j]] = value
+                if i >= header_count:
+                    break  # Cells beyond the headers are ignored
+                value = element_text(cell)
+                colspan = cell.get('colspan')
+                if colspan is None:
+                    row_data[headers[i]] = value
+                else:
+                    # Handle colspan by duplicating value over the spanned headers
+                    span = int(colspan)
+                    if span > 0:
+                        row_data.update(dict.fromkeys(headers[i:i + span], value))
             
             if row_data:
                 rows.append(row_data)
@@ -261,26 +425,27 @@ class DirectTableExtractor:
     def _is_multi_model_table(self, headers: List[str]) -> bool:
         """Check if table has multiple model columns."""
         # Look for model-like headers (start with S, have numbers)
-        model_pattern = re.compile(r'S\d+[\w\-]+')
-        return any(model_pattern.search(h) for h in headers)
+        return any(_MODEL_COLUMN_RE.search(h) for h in headers)
+    
+    def _model_columns(self, headers: List[str]) -> List[str]:
+        """Identify model columns (headers after the feature column matching the SXXXX pattern)."""
+        return [h for h in headers[1:] if _MODEL_COLUMN_RE.search(h)]
     
-    def _extract_multi_model_table(self, headers: List[str], rows: List[Dict]) -> Dict[str, Dict]:
+    def _extract_multi_model_table(self, headers: List[str], rows: List[Dict],
+                                   model_cols: Optional[List[str]] = None) -> Dict[str, Dict]:
         """Extract data from multi-model specification table."""
         result = {}
         
-        # Identify model columns (those matching SXXXX pattern)
-        model_cols = []
+        if model_cols is None:
+            model_cols = self._model_columns(headers)
         feature_col = headers[0]
         
-        for h in headers[1:]:
-            if re.search(r'S\d+[\w\-]+', h):
-                model_cols.append(h)
-        
         # Initialize result for each model
         for model in model_cols:
             result[model] = {}
         
-        # Extract data
+        # Feature-name work (skip check, normalization, port check) is done once per row
+        feature_rows = []
         for row in rows:
             feature = row.get(feature_col, '')
             if not feature:
@@ -295,25 +460,38 @@ class DirectTableExtractor:
             if not norm_feature:  # Skip if normalized to None
                 continue
             
-            for model in model_cols:
+            # Check if this is a port description (decided by the feature name alone)
+            is_port = self._is_port_description(feature, '')
+            feature_rows.append((row, feature, norm_feature, is_port))
+        
+        # Extract data column by column
+        for model in model_cols:
+            model_data = result[model]
+            for row, feature, norm_feature, is_port in feature_rows:
                 value = row.get(model, '')
                 if value and value != '-':
-                    # Check if this is a port description
-                    if self._is_port_description(feature, value):
-                        port_data = self._parse_port_description(feature, value)
-                        result[model].update(port_data)
+                    if is_port:
+                        model_data.update(self._parse_port_description(feature, value))
                     else:
-                        result[model][norm_feature] = value
+                        model_data[norm_feature] = value
         
         return result
     
     def _should_skip_param(self, param: str) -> bool:
         """Check if parameter should be skipped."""
-        param_lower = param.lower()
-        for pattern in self.skip_patterns:
-            if re.search(pattern, param_lower):
-                return True
-        return False
+        if self.skip_patterns != self._skip_source:
+            self._compile_skip_patterns()
+        return self._skip_re.search(param.lower()) is not None
+    
+    def _compile_skip_patterns(self):
+        """Compile the current skip_patterns (appended to or replaced by callers)."""
+        self._skip_source = list(self.skip_patterns)
+        # Each pattern is grouped so the alternation matches exactly when one of them does;
+        # with no patterns nothing is skipped (an empty alternation would match every name)
+        union = '|'.join(f'(?:{pattern})' for pattern in self._skip_source)
+        self._skip_re = re.compile(union or r'(?!)')
+        # Processed tables depend on which parameters were skipped
+        self._table_cache.clear()
     
     def _extract_poe_table(self, headers: List[str], rows: List[Dict]) -> Dict[str, Dict]:
         """Extract POE power table with merged cell handling."""
@@ -325,9 +503,10 @@ class DirectTableExtractor:
         ports_col = None
         
         for h in headers:
-            if 'power' in h.lower() and 'capacity' in h.lower():
+            h_lower = h.lower()
+            if 'power' in h_lower and 'capacity' in h_lower:
                 power_col = h
-            elif 'port' in h.lower() and 'quantity' in h.lower():
+            elif 'port' in h_lower and 'quantity' in h_lower:
                 ports_col = h
         
         last_model = None
@@ -378,47 +557,13 @@ class DirectTableExtractor:
         
         return result
     
-    def _normalize_param_name(self, param: str) -> Optional[str]:
-        """Normalize parameter name to Chinese."""
-        mappings = {
-            r'power\s*consumption|功耗|功率': '功耗',
-            r'input\s*voltage|额定电压|输入电压': '输入电压',
-            r'switching\s*capacity|交换容量': '交换容量',
-            r'forwarding\s*(rate|capacity)|包转发率|转发容量': '包转发率',
-            r'mac\s*address|mac地址|mac表': 'MAC地址表',
-            r'dimension|尺寸|外形尺寸': '尺寸',
-            r'weight|重量': '重量',
-            r'temperature|工作温度': '工作温度',
-            r'humidity|工作湿度|湿度': '工作湿度',
-            r'mtbf|平均无故障': 'MTBF',
-            r'mttr|平均修复': 'MTTR',
-            r'power\s*supply\s*slots?|电源槽位|电源数量|电源槽': '电源槽位数',
-            r'fan\s*(num|number|quantity)|风扇槽位|风扇数量|风扇槽|fan num': '风扇数量',
-            r'console|console口|串口|console port': 'Console口',
-            r'usb|usb口|usb port': 'USB口',
-            r'management|管理口|网管口|management port': '管理网口',
-            r'flash|flash内存': 'Flash',
-            r'sdram|内存|sdram': 'SDRAM',
-            r'cpu|处理器': 'CPU',
-            r'latency|时延|延迟|latency': '延迟',
-            r'packet\s*buffer|包缓存|报文缓存': '包缓存',
-            r'jumbo\s*frame|巨帧': '巨帧',
-            r'buffer|缓存|缓冲区': '缓存',
-            r'base-t\s*port|电口|以太网口': '电口数量',
-            r'sfp\+\s*port|sfp\+\s*光口': 'SFP+端口数',
-            r'sfp(?!\+)\s*port|sfp(?!\+)\s*光口': 'SFP端口数',
-            r'sfp28\s*port|sfp28\s*光口': 'SFP28端口数',
-            r'qsfp\+\s*port|qsfp\+\s*光口': 'QSFP+端口数',
-            r'qsfp(?!\+)\s*port|qsfp(?!\+)\s*光口': 'QSFP端口数',
-            r'qsfp28\s*port|qsfp28\s*光口': 'QSFP28端口数',
-            r'multigiga|multi-giga|2\.5g|5g|多速率': 'MultiGiga端口数',
-            r'maximum\s*stacking\s*bandwidth|堆叠带宽|最大堆叠带宽': '最大堆叠带宽',
-            r'maximum\s*stacking\s*num|堆叠数量|最大堆叠数': '最大堆叠数',
-        }
-        
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_param_name(param: str) -> Optional[str]:
+        """Normalize parameter name to Chinese (same names recur across rows and pages, so results are cached)."""
         param_lower = param.lower()
-        for pattern, chinese in mappings.items():
-            if re.search(pattern, param_lower):
+        for pattern, chinese in _PARAM_NAME_MAPPINGS:
+            if pattern.search(param_lower):
                 return chinese
         
         # Return None for unmapped params (they'll be skipped if not important)
@@ -426,8 +571,7 @@ class DirectTableExtractor:
     
     def _is_port_description(self, feature: str, value: str) -> bool:
         """Check if this is a port description row."""
-        port_keywords = ['sfp', 'qsfp', 'base-t', 'ethernet', 'port', '光口', '电口', 'multigiga', 'multi-giga']
-        return any(kw in feature.lower() for kw in port_keywords)
+        return _PORT_KEYWORDS_RE.search(feature.lower()) is not None
     
     def _parse_port_description(self, feature: str, value: str) -> Dict[str, any]:
         """Parse port description into structured data."""
@@ -442,7 +586,7 @@ class DirectTableExtractor:
         
         # First, try to extract the main port number from value (e.g., "24 (8*BASE-T combo)")
         # Pattern: number followed by optional combo info
-        main_match = re.match(r'(\d+)\s*(?:\([^)]*\))?', value_lower)
+        main_match = _PORT_COUNT_RE.match(value_lower)
         if main_match:
             port_count = int(main_match.group(1))
             
@@ -473,21 +617,16 @@ class DirectTableExtractor:
                 result['1000Base-T端口数'] = port_count
         
         # Parse Combo port info: e.g., "24 (8*BASE-T combo)" or "(8 combo)"
-        combo_match = re.search(r'\((\d+)\s*\*?\s*(?:base-t\s*)?combo\)', text)
+        combo_match = _COMBO_PORTS_RE.search(text)
         if combo_match:
             result['Combo端口数'] = int(combo_match.group(1))
         
-        # Also parse 2.5G, 5G, 10G ports from full text
-        patterns_ng = [
-            (r'(\d+)\s*[\*x×]?\s*2\.5g', '2.5G端口数'),
-            (r'(\d+)\s*[\*x×]?\s*5g', '5G端口数'),
-            (r'(\d+)\s*[\*x×]?\s*10g', '10G端口数'),
-        ]
-        
-        for pattern, port_type in patterns_ng:
-            match = re.search(pattern, text)
-            if match:
-                result[port_type] = int(match.group(1))
+        # Also parse 2.5G, 5G, 10G ports from full text (one scan when none are present)
+        if _SPEED_PORTS_ANY_RE.search(text):
+            for pattern, port_type in _SPEED_PORT_PATTERNS:
+                match = pattern.search(text)
+                if match:
+                    result[port_type] = int(match.group(1))
         
         return result
     
@@ -496,57 +635,15 @@ class DirectTableExtractor:
         result = {}
         
         # More precise patterns to avoid greedy matching issues
-        # Pattern: 15.4W (802.3af): 8 or 15.4W: 8 (802.3af)
-        af_patterns = [
-            r'15\.4W\s*\(802\.3af\)[:\s]+(\d+)(?!\d)',  # 15.4W (802.3af): 8
-            r'15\.4W[:\s]+(\d+)\s*\(802\.3af\)',       # 15.4W: 8 (802.3af)
-        ]
-        at_patterns = [
-            r'30W\s*\(802\.3at\)[:\s]+(\d+)(?!\d)',     # 30W (802.3at): 4
-            r'30W[:\s]+(\d+)\s*\(802\.3at\)',          # 30W: 4 (802.3at)
-        ]
-        bt60_patterns = [
-            r'60W\s*\(802\.3bt\)[:\s]+(\d+)(?!\d)',    # 60W (802.3bt): X
-            r'60W[:\s]+(\d+)\s*\(802\.3bt\)',          # 60W: X (802.3bt)
-        ]
-        bt90_patterns = [
-            r'90W\s*\(802\.3bt\)[:\s]+(\d+)(?!\d)',    # 90W (802.3bt): X
-            r'90W[:\s]+(\d+)\s*\(802\.3bt\)',          # 90W: X (802.3bt)
-        ]
-        
-        # Try each pattern group
-        for pattern in af_patterns:
-            match = re.search(pattern, text)
-            if match:
-                val = int(match.group(1))
-                # Validate: port count should be reasonable (1-48)
-                if 1 <= val <= 48:
-                    result['POE端口数(802.3af)'] = val
-                    break
-                
-        for pattern in at_patterns:
-            match = re.search(pattern, text)
-            if match:
-                val = int(match.group(1))
-                if 1 <= val <= 48:
-                    result['POE+端口数(802.3at)'] = val
-                    break
-                
-        for pattern in bt60_patterns:
-            match = re.search(pattern, text)
-            if match:
-                val = int(match.group(1))
-                if 1 <= val <= 48:
-                    result['POE++端口数(60W)'] = val
-                    break
-                
-        for pattern in bt90_patterns:
-            match = re.search(pattern, text)
-            if match:
-                val = int(match.group(1))
-                if 1 <= val <= 48:
-                    result['POE++端口数(90W)'] = val
-                    break
+        for field, patterns in _POE_PORT_PATTERNS:
+            for pattern in patterns:
+                match = pattern.search(text)
+                if match:
+                    val = int(match.group(1))
+                    # Validate: port count should be reasonable (1-48)
+                    if 1 <= val <= 48:
+                        result[field] = val
+                        break
         
         return result
 
@@ -596,18 +693,19 @@ class DirectTableExtractor:
                 continue
             
             # Normalize performance parameter names
+            feature_lower = feature.lower()
             norm_name = None
-            if 'mac' in feature.lower():
+            if 'mac' in feature_lower:
                 norm_name = 'MAC地址表'
-            elif 'vlan' in feature.lower() and 'table' in feature.lower():
+            elif 'vlan' in feature_lower and 'table' in feature_lower:
                 norm_name = 'VLAN表项'
-            elif 'routing' in feature.lower() or 'route' in feature.lower():
+            elif 'routing' in feature_lower or 'route' in feature_lower:
                 norm_name = '路由表项'
-            elif 'arp' in feature.lower():
+            elif 'arp' in feature_lower:
                 norm_name = 'ARP表项'
-            elif 'acl' in feature.lower():
+            elif 'acl' in feature_lower:
                 norm_name = 'ACL规则数'
-            elif 'mroute' in feature.lower() or 'multicast' in feature.lower():
+            elif 'mroute' in feature_lower or 'multicast' in feature_lower:
                 norm_name = '组播表项'
             
             if norm_name:
@@ -652,98 +750,104 @@ class DirectTableExtractor:
         
         return result
 
-    def _extract_model_descriptions(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """Extract model descriptions from the page."""
+    def _extract_model_descriptions(self, doc: etree._Element, models=None) -> Dict[str, str]:
+        """
+        Extract model descriptions from the page.
+        
+        If models is given, only descriptions for those names are guaranteed to be
+        complete, and work that cannot affect them is skipped.
+        """
         descriptions = {}
         
         # Look for text patterns like 'S5130S-28S-EI: 24 x 10/100/1000BASE-T...'
-        text_content = soup.get_text()
+        text_content = etree.tostring(doc, method='text', encoding='unicode')
         
         # Pattern: ModelName: description (up to newline or next model)
-        # Examples:
-        # S5570S-28S-EI: 24 x 10/100/1000BASE-T Ethernet ports, 4 x 1G/10G BASE-X SFP+ ports
-        # S5130S-28P-EI: 24 x 10/100/1000BASE-T Ports and 4 x 1000BASE-X SFP Ports
-        model_patterns = [
-            r'(S\d{4}[A-Z]*-[\w-]+):\s*([0-9x\s/]+(?:BASE-T|Ethernet|Ports|SFP)[^\n;]+?)(?=\n|S\d{4}|$)',
-            r'(S\d{4}[A-Z]*-[\w-]+)\s*[:：]\s*([^\n]+?)(?=\n|S\d{4}|$)',
-        ]
-        
-        for pattern in model_patterns:
-            matches = re.findall(pattern, text_content, re.IGNORECASE)
-            for model, desc in matches:
-                model = model.strip()
-                desc = desc.strip()
+        patterns = _MODEL_DESCRIPTION_PATTERNS
+        if models is not None and not any(m in text_content for m in models):
+            patterns = ()
+        for pattern in patterns:
+            for match in pattern.finditer(text_content):
+                model = match.group(1).strip()
+                desc = match.group(2).strip()
                 # Clean up description - take first sentence or up to 200 chars
                 if len(desc) > 200:
                     desc = desc[:200] + '...'
                 # Only keep if description looks valid (contains port info or reasonable length)
-                if len(desc) > 10 and (any(kw in desc.lower() for kw in ['port', 'base', 'ethernet', 'sfp']) or len(desc) < 100):
+                desc_lower = desc.lower()
+                if len(desc) > 10 and (len(desc) < 100 or any(kw in desc_lower for kw in ('port', 'base', 'ethernet', 'sfp'))):
+                    # Stop scanning once a page has yielded an implausible number of models
+                    if model not in descriptions and len(descriptions) >= self.MAX_DESCRIBED_MODELS:
+                        break
                     descriptions[model] = desc
         
         # Also look in specific HTML elements (product cards, descriptions, etc.)
         # Look for elements that contain both model name and description
-        for elem in soup.find_all(['div', 'p', 'td', 'span']):
-            text = elem.get_text(strip=True)
-            # Check if this element contains a model name
-            model_match = re.search(r'(S\d{4}[A-Z]*-[\w-]+)', text)
-            if model_match:
-                model = model_match.group(1)
-                # Check if there's a description after the model name
-                parts = text.split(model, 1)
-                if len(parts) > 1:
-                    desc = parts[1].strip()
-                    # Remove leading colon or other separators
-                    desc = re.sub(r'^[\s:：]+', '', desc)
-                    # Take reasonable length description
-                    if len(desc) > 10 and len(desc) < 200:
-                        if model not in descriptions:
-                            descriptions[model] = desc
+        if models is None:
+            for elem in doc.iter('div', 'p', 'td', 'span'):
+                self._add_element_description(element_text(elem), descriptions)
+            return descriptions
+        
+        # An element's text is a substring of its parent's, so a subtree whose text
+        # mentions none of the still-undescribed models can be skipped entirely
+        remaining = {m for m in models if m not in descriptions}
+        stack = [doc]
+        while stack and remaining:
+            elem = stack.pop()
+            text = element_text(elem)
+            if not any(m in text for m in remaining):
+                continue
+            if elem.tag in ('div', 'p', 'td', 'span'):
+                model = self._add_element_description(text, descriptions)
+                remaining.discard(model)
+            # Children in reverse so they are popped in document order
+            stack.extend(reversed(list(elem.iterchildren(etree.Element))))
         
         return descriptions
+    
+    def _add_element_description(self, text: str, descriptions: Dict[str, str]) -> Optional[str]:
+        """Record the description following the first model name in an element's text; returns the model added."""
+        # Check if this element contains a model name
+        model_match = _MODEL_NAME_RE.search(text)
+        if model_match:
+            model = model_match.group(1)
+            # Check if there's a description after the model name
+            parts = text.split(model, 1)
+            if len(parts) > 1:
+                desc = parts[1].strip()
+                # Remove leading colon or other separators
+                desc = _LEADING_SEPARATORS_RE.sub('', desc)
+                # Take reasonable length description
+                if len(desc) > 10 and len(desc) < 200:
+                    if model not in descriptions:
+                        descriptions[model] = desc
+                        return model
+        return None
 
-    def _extract_series_features(self, soup: BeautifulSoup, page_url: str = "") -> str:
+    def _extract_series_features(self, doc: etree._Element, page_url: str = "") -> str:
         """Extract series-level feature keywords from page."""
         features = []
         
-        # Look for h2/h3 headers that describe product features
-        # Skip table-related headers and generic page sections
-        skip_patterns = [
-            'hardware', 'specification', 'performance', 'poe', 'removable',
-            'components', 'matrix', 'standards', 'protocols', 'resource',
-            'related', 'cloud', 'ai', 'intelligent', 'security', 'smb',
-            'terminal', 'industry', 'solution', 'service', 'policy',
-            'online', 'training', 'partner', 'profile', 'news', 'contact',
-            'blog', 'learning', 'certification', 'exhibition',
-            '规格', '性能', '硬件', '软件', '协议', '标准', '资源',
-            '博客', '培训', '认证', '展览', '联系'
-        ]
-        
         # Only look at h2 headers (main section titles) before the tables
         # Find the first table and only consider headers before it
-        first_table = soup.find('table')
+        first_table = doc.find('.//table')
         
-        headers = soup.find_all(['h2', 'h3'])
+        # Look for h2/h3 headers that describe product features
+        headers = doc.iter('h2', 'h3')
         for h in headers:
             # Skip if after the first table (to avoid footer navigation)
-            if first_table and h.sourceline and first_table.sourceline:
+            if first_table is not None and h.sourceline and first_table.sourceline:
                 if h.sourceline > first_table.sourceline:
                     # Check if there are more tables after this header
                     # If so, it might be a valid feature section
                     pass  # We'll filter by content instead
             
-            text = h.get_text(strip=True)
+            text = element_text(h)
             # Skip if too long or too short
             if len(text) > 80 or len(text) < 5:
                 continue
-            # Skip if contains skip keywords
-            text_lower = text.lower()
-            if any(sp in text_lower for sp in skip_patterns):
-                continue
-            # Skip "Hardware Specifications (continued)" variations
-            if 'continued' in text_lower:
-                continue
-            # Skip if it looks like navigation/footer (contains common footer terms)
-            if any(term in text_lower for term in ['global', 'help', 'become', 'business']):
+            # Skip table sections, "(continued)" variations and navigation/footer titles
+            if _FEATURE_HEADER_SKIP_RE.search(text.lower()):
                 continue
             # This looks like a feature title
             if text and text not in features:
@@ -757,3 +861,38 @@ def extract_tables_direct(html: str, url: str = "") -> Dict[str, Dict]:
     """Extract tables using direct processing."""
     extractor = DirectTableExtractor()
     return extractor.extract_all_tables(html, url)
+
+
+# Each batch worker process keeps its own extractor so the table cache spans
+# the pages it handles; extractors are never shared between threads
+_worker_extractor: Optional[DirectTableExtractor] = None
+
+
+def _init_worker():
+    """ProcessPoolExecutor initializer: create the worker's extractor."""
+    global _worker_extractor
+    _worker_extractor = DirectTableExtractor()
+
+
+def _extract_page(page: Tuple[str, str]) -> Dict[str, Dict]:
+    """Worker for extract_tables_batch; module-level so it can be pickled."""
+    html, url = page
+    return _worker_extractor.extract_all_tables(html, url)
+
+
+def extract_tables_batch(pages: Iterable[Tuple[str, str]],
+                         max_workers: Optional[int] = None,
+                         chunksize: int = 8) -> List[Dict[str, Dict]]:
+    """Extract tables from many (html, url) pages in parallel processes.
+
+    Results are returned in input order. Parsing is CPU-bound, so processes
+    are used instead of threads; with max_workers=1 pages run in-process.
+    """
+    pages = list(pages)
+    if max_workers is None:
+        max_workers = min(len(pages), os.cpu_count() or 1)
+    if max_workers <= 1 or len(pages) <= 1:
+        extractor = DirectTableExtractor()
+        return [extractor.extract_all_tables(html, url) for html, url in pages]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        return list(executor.map(_extract_page, pages, chunksize=chunksize))
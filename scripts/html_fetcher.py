@@ -3,15 +3,24 @@ HTML Fetcher with proper encoding handling
 """
 import time
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class HTMLFetcher:
     """Fetches HTML pages with caching support and proper encoding."""
 
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+    }
+
     def __init__(
         self,
         delay: float = 2.0,
@@ -25,12 +34,40 @@ class HTMLFetcher:
         if self.cache_dir:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        })
+        # Plain fetch() makes a single attempt
+        self.session = self._new_session()
+        # fetch_with_retry sessions, one per attempt count, each with its own
+        # retrying adapter so the policy is never changed on a shared adapter
+        self._retry_sessions: Dict[int, requests.Session] = {}
+
+    @classmethod
+    def _new_session(cls, retry: Optional[Retry] = None) -> requests.Session:
+        """Create a session with the fetcher headers, optionally retrying with the given policy."""
+        session = requests.Session()
+        session.headers.update(cls.HEADERS)
+        if retry is not None:
+            adapter = HTTPAdapter(max_retries=retry)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        return session
+
+    @staticmethod
+    def _make_retry(max_retries: int) -> Retry:
+        """Retry policy for max_retries attempts in total, with exponential backoff between them."""
+        return Retry(
+            total=max(max_retries - 1, 0),
+            backoff_factor=1.0,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({'GET'}),
+        )
+
+    def _retry_session(self, max_retries: int) -> requests.Session:
+        """Session whose adapter retries up to max_retries attempts (created on first use)."""
+        session = self._retry_sessions.get(max_retries)
+        if session is None:
+            session = self._new_session(self._make_retry(max_retries))
+            self._retry_sessions[max_retries] = session
+        return session
 
     def _get_cache_path(self, url: str) -> Optional[Path]:
         """Get cache file path for URL."""
@@ -61,6 +98,9 @@ class HTMLFetcher:
         Common issue: UTF-8 bytes interpreted as Latin-1
         Example: 'Ã' should be '×'
         """
+        # Pure ASCII round-trips unchanged, so skip both codec passes
+        if text.isascii():
+            return text
         try:
             # Try to fix by encoding as latin-1 then decoding as utf-8
             return text.encode('latin-1').decode('utf-8')
@@ -72,6 +112,10 @@ class HTMLFetcher:
         """
         Fetch a page with proper encoding handling.
         """
+        return self._fetch(url, use_cache, self.session)
+
+    def _fetch(self, url: str, use_cache: bool, session: requests.Session) -> Optional[str]:
+        """Fetch a page through the given session (cache, encoding fix and delay as in fetch)."""
         # Try cache first
         if use_cache:
             cached = self._load_from_cache(url)
@@ -80,16 +124,17 @@ class HTMLFetcher:
 
         # Fetch from web
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = session.get(url, timeout=self.timeout)
             response.raise_for_status()
-            content = response.text
+            # response.text decodes the body (and may guess the charset) on every access
+            text = response.text
             
             # Fix encoding issues
-            content = self._fix_encoding(content)
+            content = self._fix_encoding(text)
 
             # Save to cache (original content)
             if use_cache:
-                self._save_to_cache(url, response.text)
+                self._save_to_cache(url, text)
 
             # Delay to be polite
             time.sleep(self.delay)
@@ -100,21 +145,46 @@ class HTMLFetcher:
             print(f"Failed to fetch {url}: {e}")
             return None
 
+    def fetch_many(
+        self,
+        urls: List[str],
+        use_cache: bool = True,
+        max_workers: int = 8
+    ) -> List[Optional[str]]:
+        """
+        Fetch several pages, with different hosts fetched concurrently.
+        
+        Pages on the same host are fetched one after another, so the politeness
+        delay still applies per host. Each host gets its own session, so worker
+        threads never share one. Results are returned in input order.
+        """
+        by_host: Dict[str, List[int]] = {}
+        for i, url in enumerate(urls):
+            by_host.setdefault(urlparse(url).netloc, []).append(i)
+
+        results: List[Optional[str]] = [None] * len(urls)
+
+        def fetch_host(indices: List[int]):
+            session = self._new_session()
+            try:
+                for i in indices:
+                    results[i] = self._fetch(urls[i], use_cache, session)
+            finally:
+                session.close()
+
+        if len(by_host) <= 1 or max_workers <= 1:
+            for indices in by_host.values():
+                fetch_host(indices)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(by_host))) as executor:
+                list(executor.map(fetch_host, by_host.values()))
+        return results
+
     def fetch_with_retry(
         self,
         url: str,
         max_retries: int = 3,
         use_cache: bool = True
     ) -> Optional[str]:
-        """Fetch with retry logic."""
-        for attempt in range(max_retries):
-            result = self.fetch(url, use_cache=use_cache)
-            if result:
-                return result
-
-            if attempt < max_retries - 1:
-                wait_time = 2 ** attempt
-                print(f"Retry {attempt + 1}/{max_retries} for {url} in {wait_time}s")
-                time.sleep(wait_time)
-
-        return None
+        """Fetch with retry logic (max_retries attempts, backoff between them)."""
+        return self._fetch(url, use_cache, self._retry_session(max_retries))
@@ -0,0 +1,78 @@
+"""
+lxml parsing and text helpers shared by the direct extractor and the core analyzers
+"""
+import re
+
+import lxml.html
+from lxml import etree
+
+
+# Elements whose strings are not part of the page text (same set BeautifulSoup skips in get_text)
+NON_TEXT_TAGS = ('script', 'style', 'template', 'rt', 'rp')
+
+# Opening <table> tag; pages without one cannot contain a table element, so they need not be parsed
+TABLE_OPEN_RE = re.compile(r'<table[\s>/]', re.IGNORECASE)
+
+# Cells of a row, direct children only (cells of nested tables are not included)
+row_cells = etree.XPath('th|td')
+
+
+def parse_document(html: str):
+    """Parse a whole page with lxml with non-text elements removed; returns None for empty documents."""
+    if not html or not html.strip():
+        return None
+    try:
+        try:
+            doc = lxml.html.document_fromstring(html)
+        except ValueError:
+            # str input with an XML encoding declaration must be parsed as bytes
+            doc = lxml.html.document_fromstring(html.encode('utf-8'))
+    except etree.ParserError:
+        return None
+    drop_non_text(doc)
+    return doc
+
+
+def drop_non_text(doc):
+    """
+    Remove NON_TEXT_TAGS elements so they do not count towards the text.
+    Each one is replaced with an empty comment so the text around it stays in
+    separate strings (strip_elements would merge the tail into the previous
+    string, and the whitespace between them would no longer be stripped).
+    """
+    for elem in list(doc.iter(*NON_TEXT_TAGS)):
+        parent = elem.getparent()
+        if parent is None:
+            continue
+        placeholder = etree.Comment()
+        placeholder.tail = elem.tail
+        parent.replace(elem, placeholder)
+
+
+def element_text(elem) -> str:
+    """Concatenate the stripped text pieces of an element (BeautifulSoup get_text(strip=True))."""
+    return ''.join(s.strip() for s in elem.itertext())
+
+
+def element_text_prefix(elem, limit: int) -> str:
+    """Same as element_text(elem)[:limit], but stops reading text once it has enough."""
+    parts = []
+    length = 0
+    for s in elem.itertext():
+        s = s.strip()
+        if s:
+            parts.append(s)
+            length += len(s)
+            if length >= limit:
+                break
+    return ''.join(parts)[:limit]
+
+
+def has_text_length(elem, length: int) -> bool:
+    """Whether element_text(elem) has at least `length` characters, stopping as soon as it does."""
+    total = 0
+    for s in elem.itertext():
+        total += len(s.strip())
+        if total >= length:
+            return True
+    return False
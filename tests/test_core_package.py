@@ -0,0 +1,32 @@
+"""Tests for the lazy exports in core/__init__.py"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _loaded_modules(statement: str) -> set:
+    code = f"import sys; {statement}; print(' '.join(m for m in sys.modules if m.startswith('core')))"
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return set(out.split())
+
+
+def test_importing_robust_extractor_defers_other_components():
+    loaded = _loaded_modules('import core.robust_extractor')
+    assert 'core.robust_extractor' in loaded
+    assert not loaded & {'core.visual_analyzer', 'core.config_wizard',
+                         'core.universal_extractor', 'core.page_analyzer'}
+
+
+def test_public_names_resolve_on_access():
+    loaded = _loaded_modules('from core import PageAnalyzer')
+    assert 'core.page_analyzer' in loaded
+    assert 'core.visual_analyzer' not in loaded
+
+    sys.path.insert(0, str(ROOT))
+    import core
+    from core.config_wizard import ConfigurationWizard
+    assert core.ConfigurationWizard is ConfigurationWizard
+    assert set(core.__all__) <= set(dir(core))
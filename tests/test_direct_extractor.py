@@ -0,0 +1,78 @@
+"""Regression tests for scripts/direct_extractor.py"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from direct_extractor import DirectTableExtractor, extract_tables_batch, extract_tables_direct
+
+
+def test_three_column_table_without_model_column_is_generic():
+    """Tables with 3+ headers and no model column fall back to generic extraction."""
+    mtbf = 'over 50 years under typical operating conditions ' * 5
+    html = (
+        '<html><body><table>'
+        '<tr><th>Item</th><th>Value</th><th>Remarks</th></tr>'
+        '<tr><td>Weight</td><td>5 kg</td><td>net</td></tr>'
+        '<tr><td>Dimensions</td><td>440 x 260 x 43.6 mm</td><td>W x D x H</td></tr>'
+        f'<tr><td>MTBF</td><td>{mtbf}</td><td>-</td></tr>'
+        '</table></body></html>'
+    )
+    result = DirectTableExtractor().extract_all_tables(html, 'https://example.com/')
+    assert 'generic' in result
+    assert result['generic']['重量'] == '5 kg'
+    assert result['generic']['尺寸'] == '440 x 260 x 43.6 mm'
+
+
+def test_changed_skip_patterns_bypass_cached_tables():
+    """Tables cached before skip_patterns changed are processed again with the new patterns."""
+    rows = ''.join(
+        f'<tr><td>{name}</td><td>{a}</td><td>{b}</td></tr>' for name, a, b in [
+            ('Weight', '5 kg', '6 kg'),
+            ('Dimensions (W x D x H)', '440 x 260 x 43.6 mm', '440 x 360 x 43.6 mm'),
+            ('Operating temperature', '0°C to 45°C (32°F to 113°F)', '0°C to 45°C (32°F to 113°F)'),
+            ('Operating humidity', '5% RH to 95% RH, noncondensing', '5% RH to 95% RH, noncondensing'),
+        ]
+    )
+    html = ('<html><body><table><tr><th>Feature</th><th>S5130-28S</th><th>S5130-52S</th></tr>'
+            f'{rows}</table></body></html>')
+    extractor = DirectTableExtractor()
+    assert extractor.extract_all_tables(html)['S5130-28S']['重量'] == '5 kg'
+    extractor.skip_patterns.append(r'weight')
+    assert '重量' not in extractor.extract_all_tables(html)['S5130-28S']
+    extractor.skip_patterns = []
+    assert extractor.extract_all_tables(html)['S5130-28S']['重量'] == '5 kg'
+    assert DirectTableExtractor().extract_all_tables(html)['S5130-28S']['重量'] == '5 kg'
+
+
+def _model_page(n: int) -> str:
+    """A page with one two-model hardware table whose values depend on n."""
+    rows = (
+        f'<tr><td>Weight</td><td>{n} kg</td><td>{n + 1} kg</td></tr>'
+        '<tr><td>Dimensions (W x D x H)</td><td>440 x 260 x 43.6 mm</td><td>440 x 360 x 43.6 mm</td></tr>'
+        '<tr><td>Operating temperature</td><td>0°C to 45°C (32°F to 113°F)</td><td>0°C to 45°C (32°F to 113°F)</td></tr>'
+        '<tr><td>Operating humidity</td><td>5% RH to 95% RH, noncondensing</td><td>5% RH to 95% RH, noncondensing</td></tr>'
+    )
+    return (
+        '<html><body><table>'
+        f'<tr><th>Feature</th><th>S5130-28S-{n}</th><th>S5130-52S-{n}</th></tr>{rows}'
+        '</table></body></html>'
+    )
+
+
+def test_extract_tables_direct_is_safe_across_threads():
+    """Concurrent calls give the same results as serial calls."""
+    pages = [(_model_page(n % 5), f'https://example.com/{n}') for n in range(40)]
+    expected = [extract_tables_direct(html, url) for html, url in pages]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(lambda page: extract_tables_direct(*page), pages)) == expected
+    assert expected[1]['S5130-28S-1']['重量'] == '1 kg'
+
+
+def test_extract_tables_batch_matches_serial_extraction():
+    pages = [(_model_page(n), f'https://example.com/{n}') for n in range(6)]
+    expected = [extract_tables_direct(html, url) for html, url in pages]
+    assert extract_tables_batch(pages, max_workers=2, chunksize=2) == expected
+    assert extract_tables_batch(pages, max_workers=1) == expected
+    assert extract_tables_batch([]) == []
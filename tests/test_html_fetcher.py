@@ -0,0 +1,116 @@
+"""Tests for scripts/html_fetcher.py"""
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from html_fetcher import HTMLFetcher
+
+
+class _Server:
+    """Local HTTP server that records hits; paths starting with /fail-N fail N times with 503."""
+
+    def __init__(self):
+        self.hits = Counter()
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.hits[self.path] += 1
+                    hits = server.hits[self.path]
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    if self.path.startswith('/fail-') and hits <= int(self.path.split('-')[1]):
+                        self.send_response(503)
+                        self.end_headers()
+                        return
+                    body = f'<p>{self.path}</p>'.encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/html; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+        threading.Thread(target=self.httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def servers():
+    started = [_Server() for _ in range(3)]
+    yield started
+    for server in started:
+        server.close()
+
+
+def test_fetch_many_returns_pages_in_input_order(servers):
+    urls = [f'{servers[i % 3].url}/p{i}' for i in range(9)]
+    results = HTMLFetcher(delay=0.05).fetch_many(urls, use_cache=False)
+    assert results == [f'<p>/p{i}</p>' for i in range(9)]
+    # Pages on one host are fetched one after another
+    assert all(server.max_active == 1 for server in servers)
+    assert HTMLFetcher(delay=0).fetch_many([]) == []
+
+
+def test_fetch_many_same_host_urls_run_sequentially(servers):
+    url = f'{servers[0].url}/same'
+    assert HTMLFetcher(delay=0).fetch_many([url] * 3, use_cache=False) == ['<p>/same</p>'] * 3
+    assert servers[0].hits['/same'] == 3
+
+
+def test_fetch_makes_a_single_attempt(servers):
+    server = servers[0]
+    assert HTMLFetcher(delay=0).fetch(f'{server.url}/fail-1', use_cache=False) is None
+    assert server.hits['/fail-1'] == 1
+
+
+def test_fetch_with_retry_retries_failed_attempts(servers):
+    server = servers[0]
+    fetcher = HTMLFetcher(delay=0)
+    assert fetcher.fetch_with_retry(f'{server.url}/fail-1', max_retries=2, use_cache=False) == '<p>/fail-1</p>'
+    assert server.hits['/fail-1'] == 2
+    # The retrying session does not change how plain fetch behaves
+    assert fetcher.fetch(f'{server.url}/fail-9', use_cache=False) is None
+    assert server.hits['/fail-9'] == 1
+
+
+def test_cached_pages_are_not_fetched_again(servers, tmp_path):
+    server = servers[0]
+    fetcher = HTMLFetcher(delay=0, cache_dir=str(tmp_path))
+    assert fetcher.fetch(f'{server.url}/cached') == '<p>/cached</p>'
+    assert fetcher.fetch(f'{server.url}/cached') == '<p>/cached</p>'
+    assert server.hits['/cached'] == 1
+
+
+def test_fetcher_accepts_new_attributes():
+    """Subclasses and tests may attach their own attributes."""
+    class TracingFetcher(HTMLFetcher):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.fetched = []
+
+    fetcher = TracingFetcher(delay=0)
+    fetcher.fetched.append('x')
+    fetcher.fetch = lambda url, use_cache=True: '<html></html>'
+    assert fetcher.fetch('http://example.invalid/') == '<html></html>'
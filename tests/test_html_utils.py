@@ -0,0 +1,49 @@
+"""Tests for scripts/html_utils.py"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+sys.path.insert(0, str(ROOT))
+
+import html_utils
+from html_utils import TABLE_OPEN_RE, element_text, element_text_prefix, parse_document
+
+
+@pytest.mark.parametrize('html', ['', '   \n', None])
+def test_empty_documents_are_not_parsed(html):
+    assert parse_document(html) is None
+
+
+def test_non_text_elements_are_dropped_and_neighbouring_text_kept_apart():
+    doc = parse_document(
+        '<html><head><style>p {}</style></head><body><p> a <script>x()</script> b </p>'
+        '<template>hidden</template><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby></body></html>'
+    )
+    assert element_text(doc.body) == 'ab漢'
+    assert [s for s in doc.body.find('p').itertext()] == [' a ', ' b ']
+    assert element_text_prefix(doc.body, 2) == 'ab'
+
+
+@pytest.mark.parametrize('html, found', [
+    ('<TABLE border=1>', True),
+    ('<table>', True),
+    ('<table\n class="x">', True),
+    ('<table/>', True),
+    ('<tablet>', False),
+    ('<td>table</td>', False),
+])
+def test_table_open_re(html, found):
+    assert bool(TABLE_OPEN_RE.search(html)) is found
+
+
+def test_core_and_direct_extractor_share_one_set_of_helpers():
+    import direct_extractor
+    from core import page_analyzer, universal_extractor, visual_analyzer
+    assert direct_extractor.parse_document is html_utils.parse_document
+    assert direct_extractor.TABLE_OPEN_RE is html_utils.TABLE_OPEN_RE
+    assert page_analyzer.parse_document is html_utils.parse_document
+    assert universal_extractor.element_text is html_utils.element_text
+    assert visual_analyzer.element_text_prefix is html_utils.element_text_prefix
@@ -0,0 +1,96 @@
+"""Regression tests for core/page_analyzer.py"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.page_analyzer import PageAnalyzer
+
+
+def _spec_table(model: str) -> str:
+    rows = ''.join(
+        f'<tr><td>Port switching capacity {i}</td><td>{i * 48} Gbps</td><td>{model} feature</td></tr>'
+        for i in range(1, 8)
+    )
+    return f'<table><tr><th>Feature</th><th>{model}</th><th>Remarks</th></tr>{rows}</table>'
+
+
+TABLES = _spec_table('S5130-28S') + '<p>between</p>' + _spec_table('S5130-52S')
+
+
+@pytest.fixture(autouse=True)
+def _clear_report_cache():
+    PageAnalyzer.cache_clear()
+    yield
+    PageAnalyzer.cache_clear()
+
+
+@pytest.mark.parametrize('head, before', [
+    ('', ''),
+    ('<title>a <table> b</title>', ''),
+    ('<style>/* <table> */</style>', ''),
+    ('', '<a title="<table>">link</a>'),
+    ('', '<textarea><table></textarea>'),
+    ('', '<!-- <table> -->'),
+    ('', '<script>var s = "<table>";</script>'),
+])
+def test_table_markup_outside_tables_is_ignored(head, before):
+    """'<table' text inside attributes, titles, styles, textareas, comments or scripts is not a table."""
+    html = f'<html><head>{head}</head><body>{before}{TABLES}<p>footer</p></body></html>'
+    report = PageAnalyzer().analyze(html, 'https://example.com/products/s5130/')
+    assert [t.index for t in report.detected_tables] == [0, 1]
+    assert [t.headers[1] for t in report.detected_tables] == ['S5130-28S', 'S5130-52S']
+
+
+@pytest.mark.parametrize('html', ['', '   ', '<p>no tables here</p>', '<table>'])
+def test_pages_without_data_tables_yield_empty_report(html):
+    report = PageAnalyzer().analyze(html, 'https://example.com/products/s5130/')
+    assert report.detected_tables == []
+    assert report.confidence == 0.0
+
+
+def test_cached_report_is_isolated_from_caller_mutation():
+    """Mutating a returned report does not leak into later analyses of the same page."""
+    html = f'<html><body>{TABLES}</body></html>'
+    url = 'https://example.com/products/s5130/'
+    first = PageAnalyzer().analyze(html, url)
+    expected_samples = [dict(row) for row in first.detected_tables[0].sample_data]
+    first.detected_tables[0].sample_data.clear()
+    first.detected_tables[0].headers.append('junk')
+    first.detected_tables.pop()
+    first.discovered_params.clear()
+    first.suggested_rules.append({'type': 'junk'})
+
+    second = PageAnalyzer().analyze(html, url)
+    assert len(second.detected_tables) == 2
+    assert second.detected_tables[0].sample_data == expected_samples
+    assert 'junk' not in second.detected_tables[0].headers
+    assert {'type': 'junk'} not in second.suggested_rules
+
+
+def test_cached_analysis_recomputes_profile_per_url():
+    """The same page analyzed under different URLs gets the profile for each URL."""
+    html = f'<html><body>{TABLES}</body></html>'
+    chassis = PageAnalyzer().analyze(html, 'https://example.com/products/s12500/')
+    box = PageAnalyzer().analyze(html, 'https://example.com/products/s5130/')
+    assert chassis.suggested_profile == 'H3C-Switch-Chassis'
+    assert box.suggested_profile == 'H3C-Switch-Box'
+    assert box.url == 'https://example.com/products/s5130/'
+    assert chassis.detected_tables == box.detected_tables
+    assert len(PageAnalyzer._report_cache) == 1
+
+
+def test_sample_data_keeps_rows_with_empty_cells():
+    """Rows whose cells are all empty are still sampled, as long as they have cells."""
+    rows = '<tr><td></td><td> </td><td></td></tr><tr></tr>' + ''.join(
+        f'<tr><td>Port switching capacity {i}</td><td>{i * 48} Gbps</td><td>feature</td></tr>'
+        for i in range(1, 8)
+    )
+    html = f'<table><tr><th>Feature</th><th>S5130-28S</th><th>Remarks</th></tr>{rows}</table>'
+    table = PageAnalyzer().analyze(html, 'https://example.com/').detected_tables[0]
+    assert table.sample_data == [
+        {'Feature': '', 'S5130-28S': '', 'Remarks': ''},
+        {'Feature': 'Port switching capacity 1', 'S5130-28S': '48 Gbps', 'Remarks': 'feature'},
+    ]
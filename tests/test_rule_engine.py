@@ -0,0 +1,120 @@
+"""Tests for core/rule_engine.py"""
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.rule_engine import ExtractionRule, RuleEngine, _load_yaml_cached, compile_rule_union
+
+
+def _rules(*patterns):
+    return [ExtractionRule(name=f'r{i}', pattern=p, rule_type='param_mapping', action='map_to')
+            for i, p in enumerate(patterns)]
+
+
+def _first_match_per_rule(rules, text):
+    return next((i for i, rule in enumerate(rules) if rule.compiled.search(text)), None)
+
+
+def _first_match_union(union, text):
+    m = union.match(text)
+    return int(m.lastgroup[5:]) if m else None
+
+
+@pytest.mark.parametrize('pattern', [
+    r'(a)?(?(1)b|c)port',
+    r'(?P<x>a)?(?(x)b|c)port',
+    r'(p)(o)(r)(t)(s)(e)(t)(h)(e)(r)\10',
+    r'(port)\1',
+    r'(?P<w>port)(?P=w)',
+])
+def test_group_references_disable_the_union(pattern):
+    """Rules referring to groups by number or name are matched one by one instead."""
+    assert compile_rule_union(_rules(r'fan', pattern)) is None
+
+
+def test_conditional_group_rule_matches_the_same_text_rule_by_rule():
+    rules = _rules(r'(x)?(?(1)y|z)weight', r'weight')
+    assert compile_rule_union(rules) is None
+    assert _first_match_per_rule(rules, 'xyweight') == 0
+    assert _first_match_per_rule(rules, 'zweight') == 0
+    assert _first_match_per_rule(rules, 'xweight') == 1
+
+
+@pytest.mark.parametrize('text', [
+    '', 'weight', 'Port switching capacity', 'fan number', 'PORT weight', 'power supply slots',
+    'mac address entries', 'forwarding rate (mpps)', 'x'
+])
+def test_union_picks_the_same_rule_as_matching_in_order(text):
+    rules = _rules(r'(?i)port\s+switching', r'weight|mass', r'fan', r'port', r'(power|supply)\s+slots',
+                   r'mac\s+(address)?\s*entries', r'^forwarding')
+    union = compile_rule_union(rules)
+    assert isinstance(union, re.Pattern)
+    assert _first_match_union(union, text) == _first_match_per_rule(rules, text)
+
+
+def test_yaml_cache_rereads_changed_files(tmp_path):
+    path = tmp_path / 'rules.yaml'
+    path.write_text('rules: [a]\n', encoding='utf-8')
+    assert _load_yaml_cached(path) == {'rules': ['a']}
+
+    # Different size
+    path.write_text('rules: [a, b]\n', encoding='utf-8')
+    assert _load_yaml_cached(path) == {'rules': ['a', 'b']}
+
+    # Same size, newer mtime
+    stat = path.stat()
+    path.write_text('rules: [c, d]\n', encoding='utf-8')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert _load_yaml_cached(path) == {'rules': ['c', 'd']}
+
+
+def test_yaml_cache_hands_out_independent_copies(tmp_path):
+    path = tmp_path / 'rules.yaml'
+    path.write_text('rules: [a]\n', encoding='utf-8')
+    _load_yaml_cached(path)['rules'].append('junk')
+    assert _load_yaml_cached(path) == {'rules': ['a']}
+
+
+def _write_profile(config_dir: Path, file_stem: str, name: str, parent: str = None, rules=()):
+    lines = [f'name: "{name}"', 'brand: "H3C"', 'product_type: "switch"', 'sub_type: "box"']
+    if parent:
+        lines.append(f'parent_profile: "{parent}"')
+    lines.append('param_mapping_rules:')
+    for rule_name, pattern in rules:
+        lines += [f'  - name: "{rule_name}"', f'    pattern: "{pattern}"',
+                  '    rule_type: "param_mapping"', '    action: "map_to"']
+    (config_dir / 'profiles' / f'{file_stem}.yaml').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+
+@pytest.mark.parametrize('extra_profiles', [0, RuleEngine.PARALLEL_LOAD_THRESHOLD])
+def test_parent_profiles_merge_before_children_whatever_the_file_order(tmp_path, extra_profiles):
+    (tmp_path / 'profiles').mkdir()
+    # Enough extra files switch loading to the thread pool
+    for i in range(extra_profiles):
+        _write_profile(tmp_path, f'z-other{i}', f'Other{i}', 'Base', [(f'other{i}', 'o')])
+    # File names sort child first, so the child is loaded before its ancestors
+    _write_profile(tmp_path, 'a-child', 'Child', 'Parent', [('weight', 'mass'), ('child_only', 'c')])
+    _write_profile(tmp_path, 'b-parent', 'Parent', 'Base', [('fan', 'fans?'), ('parent_only', 'p')])
+    _write_profile(tmp_path, 'c-base', 'Base', None, [('weight', 'weight'), ('fan', 'fan'), ('base_only', 'b')])
+
+    engine = RuleEngine(str(tmp_path))
+    merged = [(r.name, r.pattern) for r in engine.get_profile('Child').param_mapping_rules]
+    # Ancestor rules come first; a same-named rule from a descendant replaces it in place
+    assert merged == [('weight', 'mass'), ('fan', 'fans?'), ('base_only', 'b'),
+                      ('parent_only', 'p'), ('child_only', 'c')]
+    assert [r.name for r in engine.get_profile('Parent').param_mapping_rules] == \
+        ['weight', 'fan', 'base_only', 'parent_only']
+
+
+def test_parent_cycles_do_not_recurse_forever(tmp_path):
+    (tmp_path / 'profiles').mkdir()
+    _write_profile(tmp_path, 'a', 'A', 'B', [('a', 'a')])
+    _write_profile(tmp_path, 'b', 'B', 'A', [('b', 'b')])
+    engine = RuleEngine(str(tmp_path))
+    assert {r.name for r in engine.get_profile('A').param_mapping_rules} >= {'a'}
+    assert {r.name for r in engine.get_profile('B').param_mapping_rules} >= {'b'}
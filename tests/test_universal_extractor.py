@@ -0,0 +1,83 @@
+"""Tests for core/universal_extractor.py"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import rule_engine
+from core.rule_engine import ExtractionRule
+from core.universal_extractor import UniversalExtractor
+
+PROFILE = '''\
+name: "Test-Box"
+brand: "H3C"
+product_type: "switch"
+sub_type: "box"
+param_mapping_rules:
+{rules}
+'''
+
+RULE = '''\
+  - name: "{name}"
+    pattern: "{pattern}"
+    rule_type: "param_mapping"
+    action: "{action}"
+    priority: {priority}
+    params:
+      target: "{target}"
+'''
+
+
+def _extractor(tmp_path, monkeypatch, rules):
+    """UniversalExtractor on a private config directory holding one profile with the given rules."""
+    (tmp_path / 'profiles').mkdir()
+    text = ''.join(RULE.format(name=f'r{i}', pattern=pattern, action=action, priority=priority, target=target)
+                   for i, (pattern, action, priority, target) in enumerate(rules))
+    (tmp_path / 'profiles' / 'test-box.yaml').write_text(PROFILE.format(rules=text), encoding='utf-8')
+    monkeypatch.setattr(rule_engine, '_default_engine', None)
+    extractor = UniversalExtractor(profile_name='Test-Box', config_dir=str(tmp_path))
+    extractor.extract('<p>no tables</p>', 'https://example.com/')
+    return extractor
+
+
+def _expected_target(extractor, name):
+    """Reference mapping: profile rules by descending priority, first map_to rule that searches true."""
+    rules = sorted(extractor.profile.param_mapping_rules, key=lambda r: r.priority, reverse=True)
+    for rule in rules:
+        if rule.enabled and rule.compiled is not None and rule.action == 'map_to' and rule.compiled.search(name.lower()):
+            return rule.params.get('target')
+    return None
+
+
+RULES = [
+    ('port', 'map_to', 50, '端口'),
+    ('switching capacity', 'map_to', 90, '交换容量'),
+    ('weight', 'skip', 95, 'ignored'),
+    ('weight|mass', 'map_to', 60, '重量'),
+    ('^fan', 'map_to', 70, '风扇数量'),
+]
+NAMES = ['Port switching capacity', 'Weight', 'Fan number', 'fan tray port', 'Mass', 'MTBF', '']
+
+
+@pytest.mark.parametrize('extra', [[], [('(x)?(?(1)y|z)port', 'map_to', 80, '条件端口')]])
+def test_rule_union_matches_like_rule_by_rule(tmp_path, monkeypatch, extra):
+    """The merged matcher picks the same rule as trying the rules in priority order, with or without the union."""
+    extractor = _extractor(tmp_path, monkeypatch, RULES + extra)
+    union, _ = extractor._build_rule_matcher('param_mapping')
+    assert (union is None) == bool(extra)
+    for name in NAMES + ['zport']:
+        assert extractor._normalize_param_name(name) == _expected_target(extractor, name), name
+    assert extractor._normalize_param_name('Port switching capacity') == '交换容量'
+
+
+def test_update_rule_rebuilds_cached_matchers(tmp_path, monkeypatch):
+    extractor = _extractor(tmp_path, monkeypatch, RULES)
+    assert extractor._normalize_param_name('Zorblax capacity') is None
+
+    extractor.engine.update_rule('Test-Box', 'param_mapping', ExtractionRule(
+        name='zorb', pattern='zorblax', rule_type='param_mapping', action='map_to',
+        params={'target': 'ZORB'}, priority=999))
+    extractor.extract('<p>no tables</p>', 'https://example.com/')
+    assert extractor._normalize_param_name('Zorblax capacity') == 'ZORB'